@@ -1,18 +1,37 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+def __getattr__(nombre):
+    # db se crea al primer `from app import db`: así el motor del AG (genetico,
+    # instancia, dominios...) se importa sin Flask ni SQLAlchemy (ver app.solver)
+    if nombre == "db":
+        global db
+        from flask_sqlalchemy import SQLAlchemy
+        db = SQLAlchemy()
+        return db
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
-db = SQLAlchemy()
+def create_app(config=None):
+    from flask import Flask
+    from app import db
 
-def create_app():
     app = Flask(__name__)
     app.config.from_object("app.config.Config")
+    if config:
+        app.config.update(config)  # p.ej. otra BD para benchmarks
 
     db.init_app(app)
 
     with app.app_context():
+        from .esquema import configurar_sqlite
+        configurar_sqlite(db.engine, app.config.get("SQLITE_PRAGMAS"))
+        from .consultas import vigilar_consultas
+        vigilar_consultas(app, db.engine, app.config.get("SQL_MAX_CONSULTAS"))
         from . import models
+        from . import cache_horario
+        cache_horario.cache.max_tam = app.config["HORARIO_CACHE"]
+        cache_horario.vigilar_catalogo((models.Grupo, models.Materia, models.Docente))
         from .routes import bp as main_bp
         app.register_blueprint(main_bp)
         db.create_all()  # Crea la BD (SQLite) al primer arranque
+        from .esquema import actualizar_esquema
+        actualizar_esquema()
 
     return app
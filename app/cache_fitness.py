@@ -0,0 +1,57 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+
+
+class CacheFitness:
+    """ Memoriza puntajes por cromosoma con desalojo LRU.
+        La clave es un resumen blake2b de 16 bytes de los hashes de los genes: de
+        tamaño fijo, así que la cache no retiene los cromosomas y un acierto compara
+        16 bytes, no n genes. Calcularla hashea cada gen una vez; una colisión (hash de
+        64 bits por gen, resumen de 128) es despreciable. Los hashes de str cambian
+        entre procesos: cada proceso tiene su propia cache. """
+
+    def __init__(self, max_tam=2048):
+        self.max_tam = max_tam
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+
+    @staticmethod
+    def clave(ind):
+        return hashlib.blake2b(array("q", map(hash, ind)).tobytes(), digest_size=16).digest()
+
+    def obtener(self, clave):
+        """ Puntaje memorizado o None; un acierto mueve la entrada al final (más reciente). """
+        puntaje = self._datos.get(clave)
+        if puntaje is None:
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return puntaje
+
+    def guardar(self, clave, puntaje):
+        if self.max_tam <= 0:
+            return
+        self._datos[clave] = puntaje
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_tam:
+            self._datos.popitem(last=False)
+
+    def limpiar(self):
+        self._datos.clear()
+        self.aciertos = self.fallos = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            "tam": len(self._datos),
+            "max_tam": self.max_tam,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+        }
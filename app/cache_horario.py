@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+# Vista ya armada del horario: cuerpo (bytes), mimetype, ETag y cuándo se armó
+Vista = namedtuple("Vista", "cuerpo mimetype etag modificada")
+
+
+class CacheHorario:
+    """ Vistas del horario (/horario, /tablero, APIs) ya renderizadas, con desalojo LRU.
+        La clave incluye la versión: las filas de una versión no cambian después de
+        crearla, así que sólo hace falta invalidar al publicar otra versión (cambia
+        cuál se muestra) o al editar nombres del catálogo que aparecen en las vistas.
+        Compartida entre los hilos del servidor, pero no entre procesos: cada worker
+        tiene la suya (ver vigilar_catalogo). """
+
+    def __init__(self, max_tam=256):
+        self.max_tam = max_tam
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidada = datetime.now(timezone.utc).replace(microsecond=0)
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """ Vista memorizada o None; un acierto la mueve al final (más reciente). """
+        with self._lock:
+            vista = self._datos.get(clave)
+            if vista is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return vista
+
+    def armar(self, cuerpo, mimetype, modificada=None):
+        """ Vista sin memorizar: ETag = hash del cuerpo; última modificación = la más
+            reciente entre `modificada` (la de la versión mostrada, que vale en todos
+            los procesos) y la última invalidación de esta cache (ediciones del
+            catálogo vistas por este proceso). """
+        if isinstance(cuerpo, str):
+            cuerpo = cuerpo.encode("utf-8")
+        if modificada is None or modificada < self.invalidada:
+            modificada = self.invalidada
+        return Vista(cuerpo, mimetype, hashlib.sha1(cuerpo).hexdigest(), modificada)
+
+    def guardar(self, clave, cuerpo, mimetype, modificada=None):
+        """ Arma la Vista y la memoriza (si max_tam > 0). """
+        vista = self.armar(cuerpo, mimetype, modificada)
+        if self.max_tam <= 0:
+            return vista
+        with self._lock:
+            self._datos[clave] = vista
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_tam:
+                self._datos.popitem(last=False)
+        return vista
+
+    def invalidar(self):
+        """ Descarta todo; Last-Modified de lo que se arme después pasa a ser ahora. """
+        with self._lock:
+            self._datos.clear()
+            self.invalidada = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            "tam": len(self._datos),
+            "max_tam": self.max_tam,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+        }
+
+
+# Única instancia del proceso (create_app ajusta max_tam con HORARIO_CACHE)
+cache = CacheHorario()
+
+
+def invalidar():
+    cache.invalidar()
+
+
+def _revisar_flush(sesion, contexto):
+    """ Sólo marca la sesión: el flush todavía puede deshacerse. """
+    cambios = list(sesion.new) + list(sesion.dirty) + list(sesion.deleted)
+    if any(isinstance(obj, _modelos_vigilados) for obj in cambios):
+        sesion.info[MARCA] = True
+
+
+def _al_confirmar(sesion):
+    if sesion.info.pop(MARCA, False):
+        invalidar()
+
+
+def _al_deshacer(sesion):
+    sesion.info.pop(MARCA, None)
+
+
+MARCA = "invalidar_horario"
+_modelos_vigilados = ()
+_OYENTES = (("after_flush", _revisar_flush), ("after_commit", _al_confirmar),
+            ("after_rollback", _al_deshacer))
+
+
+def vigilar_catalogo(modelos):
+    """ Invalida la cache cuando una sesión confirma (commit) un alta, cambio o baja
+        de alguna instancia de `modelos`: los nombres de grupos, materias y docentes
+        salen en las vistas cacheadas. El flush sólo marca la sesión; un rollback
+        descarta la marca. Las altas y bajas masivas (sintetico, seed) no pasan
+        por aquí; quien las hace llama a invalidar().
+        La cache es de cada proceso: con varios workers, un cambio hecho en otro
+        proceso no invalida la de éste (sus vistas siguen vigentes hasta que este
+        mismo proceso invalide o las desaloje). """
+    global _modelos_vigilados
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    _modelos_vigilados = tuple(modelos)
+    for nombre, oyente in _OYENTES:
+        if not event.contains(Session, nombre, oyente):
+            event.listen(Session, nombre, oyente)
@@ -4,3 +4,42 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///horarios.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite: WAL deja leer el horario mientras el AG escribe una versión nueva;
+    # busy_timeout espera (ms) en vez de fallar con "database is locked"
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+        "cache_size": -16000,           # 16 MiB por conexión
+        "temp_store": "MEMORY",
+    }
+    # Aviso (o error con DEBUG/TESTING) si una petición hace más consultas SQL que esto; None = sin límite
+    SQL_MAX_CONSULTAS = int(os.environ["SQL_MAX_CONSULTAS"]) if os.environ.get("SQL_MAX_CONSULTAS") else None
+    HORARIO_CACHE = int(os.environ.get("HORARIO_CACHE", 256))  # vistas del horario en cache; 0 = sin cache
+    AG_CACHE_FITNESS = int(os.environ.get("AG_CACHE_FITNESS", 2048))  # entradas LRU del fitness
+    AG_MUTACION = os.environ.get("AG_MUTACION", "reiniciar")  # "reiniciar" | "reparar" (opcional)
+    AG_CRUCE = os.environ.get("AG_CRUCE", "grupo")  # "grupo" | "turno"
+    AG_TASA_CRUCE = float(os.environ.get("AG_TASA_CRUCE", 0.6))
+    AG_SELECCION = os.environ.get("AG_SELECCION", "torneo")  # "torneo" | "ruleta"
+    AG_ISLAS = int(os.environ.get("AG_ISLAS", 1))  # 1 = corrida serial; >1 = islas en procesos
+    AG_INTERVALO_MIGRACION = int(os.environ.get("AG_INTERVALO_MIGRACION", 10))
+    AG_MIGRANTES = int(os.environ.get("AG_MIGRANTES", 2))
+    AG_SEMILLA = int(os.environ["AG_SEMILLA"]) if os.environ.get("AG_SEMILLA") else None
+    AG_PROCESOS_INICIAL = int(os.environ.get("AG_PROCESOS_INICIAL", 1))  # población inicial en paralelo
+    AG_CONSTRUCTOR = os.environ.get("AG_CONSTRUCTOR", "plan")  # "plan" | "restringido" (opcional)
+    # Criterios de parada: sin AG_OBJETIVO se usa el puntaje máximo posible; sin AG_TIEMPO_MAX no hay límite
+    AG_OBJETIVO = int(os.environ["AG_OBJETIVO"]) if os.environ.get("AG_OBJETIVO") else None
+    AG_ESTANCAMIENTO = int(os.environ["AG_ESTANCAMIENTO"]) if os.environ.get("AG_ESTANCAMIENTO") else 20
+    AG_TIEMPO_MAX = float(os.environ["AG_TIEMPO_MAX"]) if os.environ.get("AG_TIEMPO_MAX") else None
+    # Descomposición en subproblemas independientes (grupos/docentes por turno), cada uno en su proceso
+    AG_DESCOMPONER = os.environ.get("AG_DESCOMPONER", "0") == "1"
+    AG_PROCESOS_DESCOMPOSICION = int(os.environ["AG_PROCESOS_DESCOMPOSICION"]) \
+        if os.environ.get("AG_PROCESOS_DESCOMPOSICION") else None  # None = uno por subproblema
+    # Arranque en caliente: parte de la población inicial sale del horario publicado
+    AG_PARTIR_DE_PUBLICADO = os.environ.get("AG_PARTIR_DE_PUBLICADO", "0") == "1"
+    AG_FRACCION_PUBLICADO = float(os.environ.get("AG_FRACCION_PUBLICADO", 0.5))
+    # Tras quitar una disponibilidad o agregar una reserva, reprograma sólo lo afectado
+    AG_REPROGRAMAR_AL_EDITAR = os.environ.get("AG_REPROGRAMAR_AL_EDITAR", "0") == "1"
+    # Telemetría: corre el AG bajo cProfile / tracemalloc (resultados en /api/ag/metricas)
+    AG_PERFIL = os.environ.get("AG_PERFIL", "0") == "1"
+    AG_MEMORIA = os.environ.get("AG_MEMORIA", "0") == "1"
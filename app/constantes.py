@@ -0,0 +1,15 @@
+from enum import Enum
+
+# Constantes del dominio sin dependencias: las usan los modelos y también el motor
+# del AG, que se puede importar sin Flask ni SQLAlchemy (ver app.solver).
+
+class Turno(str, Enum):
+    MATUTINO = "MATUTINO"     # 07:00–13:40 (bloques 1..8)
+    VESPERTINO = "VESPERTINO" # 14:00–20:40 (bloques 1..8)
+
+DIAS = ["LUNES", "MARTES", "MIERCOLES", "JUEVES", "VIERNES"]
+
+# Reloj de los bloques: el bloque b de un turno empieza a
+# INICIO_TURNO + (b - 1) * MINUTOS_BLOQUE (minutos desde medianoche) y dura MINUTOS_BLOQUE
+MINUTOS_BLOQUE = 50
+INICIO_TURNO = {Turno.MATUTINO: 7 * 60, Turno.VESPERTINO: 14 * 60}
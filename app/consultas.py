@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+# -------------------- Conteo de consultas SQL --------------------
+def vigilar_consultas(app, engine, limite=None):
+    """ Cuenta las consultas SQL de cada petición y las informa en la cabecera
+        X-Consultas-SQL. Si una petición pasa de `limite` se registra un aviso o,
+        con DEBUG o TESTING, falla con AssertionError: un N+1 nuevo en un listado
+        salta en cuanto se lo abre con datos (ver tests/test_consultas.py y
+        benchmark.py consultas). """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _contar(*args):
+        if has_request_context():
+            g.consultas_sql = g.get("consultas_sql", 0) + 1
+
+    @app.after_request
+    def _revisar(respuesta):
+        n = g.get("consultas_sql", 0)
+        respuesta.headers["X-Consultas-SQL"] = str(n)
+        if limite is not None and n > limite:
+            mensaje = f"{request.method} {request.path}: {n} consultas SQL (límite {limite})"
+            if app.debug or app.testing:
+                raise AssertionError(mensaje)
+            app.logger.warning(mensaje)
+        return respuesta
+
+
+@contextmanager
+def contar_consultas(engine):
+    """ Lista con las sentencias SQL que se ejecutan dentro del bloque. """
+    sentencias = []
+
+    def _anotar(con, cursor, sentencia, *args):
+        sentencias.append(sentencia)
+
+    event.listen(engine, "before_cursor_execute", _anotar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, "before_cursor_execute", _anotar)
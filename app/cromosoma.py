@@ -0,0 +1,50 @@
+from array import array
+from app.constantes import DIAS
+from app.ocupacion import IDX_DIA
+
+# Cromosoma compacto: por sesión, en el orden de inst.sesiones, cuatro enteros de 16
+# bits (índice denso del docente, índice del día, bloque inicial y final), con SIN en
+# lugar de None. Grupo, materia y turno no se guardan: los fija inst.sesiones[i].
+# Para mover poblaciones entre procesos; el AG trabaja con la lista de tuplas.
+CAMPOS = 4
+SIN = -1
+
+
+def compactar(ind, inst):
+    """ Individuo de tuplas -> array("h") de CAMPOS enteros por gen. Cada campo se
+        codifica por separado, así que también conserva genes a medio asignar (p.ej.
+        una reserva sin docente). ValueError si ind no sigue a inst.sesiones. """
+    if len(ind) != inst.n_sesiones:
+        raise ValueError(f"El individuo tiene {len(ind)} genes y la instancia {inst.n_sesiones} sesiones")
+    datos = array("h")
+    for (g, m, d, dia, turno, ini, fin), sesion in zip(ind, inst.sesiones):
+        if (g, m, turno) != sesion:
+            raise ValueError(f"Gen {(g, m, turno)} fuera del orden de la instancia ({sesion})")
+        datos.extend((SIN if d is None else inst.idx_docente[d],
+                      SIN if dia is None else IDX_DIA[dia],
+                      SIN if ini is None else ini,
+                      SIN if fin is None else fin))
+    return datos
+
+
+def expandir(datos, inst):
+    """ Inversa de compactar(): lista de (grupo_id, materia_id, docente_id|None,
+        dia|None, turno, ini|None, fin|None). """
+    ind = []
+    for i, (g, m, turno) in enumerate(inst.sesiones):
+        d, dia, ini, fin = datos[CAMPOS * i:CAMPOS * i + CAMPOS]
+        ind.append((g, m,
+                    None if d == SIN else inst.docentes[d],
+                    None if dia == SIN else DIAS[dia],
+                    turno,
+                    None if ini == SIN else ini,
+                    None if fin == SIN else fin))
+    return ind
+
+
+def compactar_poblacion(poblacion, inst):
+    return [compactar(ind, inst) for ind in poblacion]
+
+
+def expandir_poblacion(poblacion, inst):
+    return [expandir(datos, inst) for datos in poblacion]
@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+from app.cromosoma import compactar_poblacion, expandir_poblacion
+from app.evaluador import EvaluadorIncremental
+from app.genetico import (
+    evolucionar, evaluar_poblacion, liberar_choques, reparar, _ordenar, ResultadoAG
+)
+from app.telemetria import Telemetria
+
+
+# -------------------- Subproblemas independientes --------------------
+def componentes(inst):
+    """ Parte las sesiones en subproblemas que no comparten restricciones.
+
+        Una sesión (g, m, turno) une al grupo g con cada docente habilitado para m
+        en ese turno. Los slots de un docente llevan el turno, así que un docente
+        que da clase en ambos turnos es un nodo distinto por turno; el grupo no se
+        parte porque el límite de materias por día cuenta sesiones de todo turno.
+        Devuelve listas de índices de inst.sesiones, una por componente conexa. """
+    padre = {}
+
+    def raiz(x):
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for g, m, turno in inst.sesiones:
+        for d in inst.docentes_por_materia.get(m, ()):
+            padre[raiz(("d", d, turno))] = raiz(("g", g))
+    grupos = {}
+    for i, (g, m, turno) in enumerate(inst.sesiones):
+        grupos.setdefault(raiz(("g", g)), []).append(i)
+    return list(grupos.values())
+
+
+def subinstancia(inst, indices):
+    """ La misma Instancia restringida a esas sesiones (el resto de los datos son consultas por id). """
+    return replace(inst, sesiones=tuple(inst.sesiones[i] for i in indices))
+
+
+# Cada cuánto (segundos) el proceso principal llama a progreso mientras espera al pool,
+# para que una cancelación no tenga que esperar a que termine una componente
+INTERVALO_PROGRESO = 0.5
+
+# En los procesos del pool: el Event que el proceso principal activa al cancelar
+_cancelada = None
+
+
+class _Cancelada(Exception):
+    pass
+
+
+def _iniciar_proceso(evento):
+    global _cancelada
+    _cancelada = evento
+
+
+def _revisar_cancelacion(generacion, generaciones, mejor):
+    if _cancelada is not None and _cancelada.is_set():
+        raise _Cancelada()
+
+
+def _resolver(sub, poblacion, generaciones, tam, elite, semilla, limite, opciones, progreso=None):
+    # limite: hora (time.time()) en que se acaba el tiempo de toda la corrida; cada
+    # componente recibe sólo lo que queda al empezar
+    random.seed(semilla)
+    if limite is not None:
+        opciones = dict(opciones, tiempo_max=max(limite - time.time(), 0))
+    return evolucionar(sub, generaciones, tam, elite, poblacion=poblacion, progreso=progreso, **opciones)
+
+
+def _resolver_en_proceso(sub, poblacion, generaciones, tam, elite, semilla, limite, opciones):
+    # las poblaciones cruzan entre procesos compactas (ver app.cromosoma)
+    if poblacion is not None:
+        poblacion = expandir_poblacion(poblacion, sub)
+    r = _resolver(sub, poblacion, generaciones, tam, elite, semilla, limite, opciones, _revisar_cancelacion)
+    r.poblacion = compactar_poblacion(r.poblacion, sub)
+    return r
+
+
+def evolucionar_descompuesto(inst, generaciones=60, tam=30, elite=6, semilla=None, procesos=None,
+                             progreso=None, telemetria=None, poblacion=None, **opciones):
+    """ Resuelve cada componente (ver componentes()) con su propio AG, en paralelo
+        con `procesos` procesos (None = uno por componente hasta os.cpu_count()), y
+        une los resultados: el k-ésimo individuo de la población final es la unión
+        de los k-ésimos de cada componente.
+        Al unir se revisan de nuevo los choques de docentes entre componentes (no
+        debería haber: las componentes no comparten docente y turno) y lo que se
+        libere se reubica con reparar(). El fitness es aditivo por componente.
+        opciones: las de evolucionar() salvo objetivo: cada componente para al llegar
+        a su propio puntaje máximo (un objetivo global no se puede repartir).
+        tiempo_max es para toda la llamada: en el pool cada componente corre con lo
+        que quede cuando empieza; en serie, con su parte de lo que queda.
+        progreso(generacion, generaciones, None): en serie, en cada generación de cada
+        componente; con el pool, cada INTERVALO_PROGRESO segundos y al terminar cada
+        componente. Si lanza una excepción (cancelar) se avisa a los procesos, que
+        paran en su próxima generación, y las componentes en cola no se corren.
+        Devuelve un ResultadoAG con la población unida. """
+    if semilla is None:
+        semilla = random.randrange(2 ** 32)
+    opciones.pop("objetivo", None)
+    tiempo_max = opciones.pop("tiempo_max", None)
+    limite = None if tiempo_max is None else time.time() + tiempo_max
+    if telemetria is None:
+        telemetria = Telemetria()
+    comps = componentes(inst)
+    subs = [subinstancia(inst, comp) for comp in comps]
+    iniciales = [None] * len(comps)
+    if poblacion is not None:
+        iniciales = [[[ind[i] for i in comp] for ind in poblacion] for comp in comps]
+    if procesos is None:
+        procesos = min(len(comps), os.cpu_count() or 1)
+
+    resultados = [None] * len(comps)
+    with telemetria.fase("componentes"):
+        if procesos > 1 and len(comps) > 1:
+            cancelada = multiprocessing.Event()
+            with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(cancelada,)) as pool:
+                futuros = {pool.submit(_resolver_en_proceso, sub,
+                                       None if ini is None else compactar_poblacion(ini, sub),
+                                       generaciones, tam, elite, f"{semilla}:{k}", limite, opciones): k
+                           for k, (sub, ini) in enumerate(zip(subs, iniciales))}
+                pendientes, hechos = set(futuros), 0
+                try:
+                    while pendientes:
+                        listos, pendientes = wait(pendientes, INTERVALO_PROGRESO, FIRST_COMPLETED)
+                        for futuro in listos:
+                            k = futuros[futuro]
+                            resultados[k] = futuro.result()
+                            resultados[k].poblacion = expandir_poblacion(resultados[k].poblacion, subs[k])
+                            hechos += 1
+                        if progreso:
+                            progreso(generaciones * hechos // len(comps), generaciones, None)
+                except BaseException:
+                    cancelada.set()
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+        else:
+            for k, (sub, ini) in enumerate(zip(subs, iniciales)):
+                avance = None
+                if progreso:
+                    def avance(generacion, total, mejor, k=k):
+                        progreso((generaciones * k + generaciones * generacion // max(total, 1)) // len(comps),
+                                 generaciones, None)
+                # en serie el tiempo que queda se reparte entre las componentes que faltan
+                limite_k = None if limite is None else time.time() + (limite - time.time()) / (len(comps) - k)
+                resultados[k] = _resolver(sub, ini, generaciones, tam, elite, f"{semilla}:{k}", limite_k,
+                                          opciones, avance)
+
+    with telemetria.fase("union"):
+        unidos = []
+        for k in range(min(len(r.poblacion) for r in resultados)):
+            ind = [None] * inst.n_sesiones
+            for comp, r in zip(comps, resultados):
+                for j, i in enumerate(comp):
+                    ind[i] = r.poblacion[k][j]
+            unidos.append(ind)
+        # restricciones entre componentes: sólo se toca lo que choque
+        ev = EvaluadorIncremental(unidos[0], inst)
+        liberar_choques(unidos[0], ev)
+        reparar(unidos[0], inst, ev)
+        unidos, puntajes = _ordenar(unidos, evaluar_poblacion(unidos, inst))
+
+    # el fitness es la suma por componente; una componente que paró antes repite su último valor
+    corridas = max(len(r.historial) for r in resultados)
+    historial = [sum(r.historial[min(k, len(r.historial) - 1)] for r in resultados)
+                 for k in range(corridas)]
+    historial[-1] = puntajes[0]
+    principal = max(resultados, key=lambda r: r.generaciones)
+    telemetria.generacion(principal.generaciones, puntajes, evaluaciones=None)
+    return ResultadoAG(unidos, puntajes, historial, principal.generaciones, principal.motivo)
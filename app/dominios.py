@@ -0,0 +1,113 @@
+from collections import Counter, namedtuple
+from functools import lru_cache
+from app.constantes import DIAS
+from app.ocupacion import BLOQUES_POR_TURNO, mascara
+
+# Una ubicación posible de una sesión: tramo ini..fin del día y docentes que pueden darla ahí
+Opcion = namedtuple("Opcion", "dia ini fin tramo docentes")
+# libres: opciones fuera de cualquier reserva del grupo; reservas: los tramos fijos de (g, m)
+Dominio = namedtuple("Dominio", "libres reservas")
+
+
+# -------------------- Dominios factibles --------------------
+class Dominios(dict):
+    """ dict[(grupo_id, materia_id)] = Dominio de sus sesiones, armado la primera vez
+        que se pide: reparar y reprogramar sólo pagan por las sesiones que tocan.
+        completos() arma los que falten (sin_dominio, /api/ag/dominios). """
+
+    def __init__(self, inst):
+        super().__init__()
+        self.inst = inst
+        self.turnos = {(g, m): turno for g, m, turno in inst.sesiones}
+        self.reservas_por = {}
+        for (g, m, dia), rango in inst.reservas_rangos.items():
+            self.reservas_por.setdefault((g, m), []).append((dia, rango))
+
+    def __missing__(self, clave):
+        dom = self[clave] = _dominio(self.inst, *clave, self.turnos[clave], self.reservas_por.get(clave, ()))
+        return dom
+
+    def completos(self):
+        """ Todos los dominios del plan, en el orden de inst.sesiones. """
+        return {clave: self[clave] for clave in self.turnos}
+
+
+@lru_cache(maxsize=8)
+def dominios(inst):
+    """ Dominios de la Instancia (ver Dominios).
+
+        Sólo depende del catálogo (Disponibilidad, DocenteMateria, ReservaModulo y
+        bloques_duracion), así que se calcula una vez por Instancia; constructores y
+        mutación eligen de aquí y sólo revisan la ocupación del individuo. """
+    return Dominios(inst)
+
+
+def _dominio(inst, g, m, turno, reservas_gm):
+    candidatos = inst.docentes_por_materia.get(m, ())
+    dur = inst.duracion[m]
+    reservado = inst.reservas_mascara.get(g, 0)
+    libres = []
+    for dia in DIAS:
+        for ini in range(1, BLOQUES_POR_TURNO - dur + 2):
+            fin = ini + dur - 1
+            tramo = mascara(dia, turno, ini, fin)
+            if reservado & tramo:
+                continue
+            docentes = _disponibles(inst, candidatos, tramo)
+            if docentes:
+                libres.append(Opcion(dia, ini, fin, tramo, docentes))
+    reservas = []
+    for dia, (ini, fin) in reservas_gm:
+        tramo = mascara(dia, turno, ini, fin)
+        reservas.append(Opcion(dia, ini, fin, tramo, _disponibles(inst, candidatos, tramo)))
+    return Dominio(tuple(libres), tuple(reservas))
+
+
+def _disponibles(inst, candidatos, tramo):
+    return tuple(d for d in candidatos if inst.disponibilidad.get(d, 0) & tramo == tramo)
+
+
+def sin_dominio(inst):
+    """ (grupo_id, materia_id) con sesiones sin ninguna ubicación factible: no hay
+        tramo libre con docente disponible y sobran sesiones para sus reservas con
+        docente. Ninguna corrida del AG podrá asignarlas todas. """
+    sesiones = Counter((g, m) for g, m, turno in inst.sesiones)
+    return [clave for clave, dom in dominios(inst).completos().items()
+            if not dom.libres and sesiones[clave] > sum(1 for op in dom.reservas if op.docentes)]
+
+
+def elegir(opciones, ocupado, uso_docente, rng):
+    """ Opción al azar que no pise `ocupado` (máscara del grupo) y tenga un docente
+        libre según uso_docente (docente_id -> máscara). Filtra primero con un AND
+        por opción y sortea entre las que quedan: (opcion, docente_id) o None. """
+    factibles = [op for op in opciones if not ocupado & op.tramo]
+    while factibles:
+        k = rng.randrange(len(factibles))
+        op = factibles[k]
+        docente = elegir_docente(op, uso_docente, rng)
+        if docente is not None:
+            return op, docente
+        factibles[k] = factibles[-1]
+        factibles.pop()
+    return None
+
+
+def elegir_compacta(opciones, ocupado, uso_docente, rng):
+    """ Como elegir() pero entre las opciones factibles se queda con las que tapan
+        menos de las otras (valor menos restrictivo): prefiere tramos pegados a lo
+        ya ocupado o al borde del turno y no deja huecos sueltos. Cuadrático en las
+        opciones factibles; pensado para el constructor "restringido". """
+    factibles = [op for op in opciones if not ocupado & op.tramo
+                 and any(not uso_docente[d] & op.tramo for d in op.docentes)]
+    if not factibles:
+        return None
+    costo = [sum(1 for otra in factibles if otra.tramo & op.tramo) for op in factibles]
+    minimo = min(costo)
+    op = rng.choice([op for op, c in zip(factibles, costo) if c == minimo])
+    return op, elegir_docente(op, uso_docente, rng)
+
+
+def elegir_docente(op, uso_docente, rng):
+    """ Docente al azar de op libre en su tramo, o None. """
+    libres = [d for d in op.docentes if not uso_docente[d] & op.tramo]
+    return rng.choice(libres) if libres else None
@@ -0,0 +1,53 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, text
+from app import db
+
+
+# -------------------- SQLite --------------------
+def configurar_sqlite(engine, pragmas):
+    """ Aplica los PRAGMA (dict nombre -> valor) a cada conexión nueva del engine;
+        no hace nada si la BD no es SQLite. journal_mode=WAL queda guardado en el
+        archivo, el resto vale por conexión. """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(con, registro):
+        cursor = con.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+
+# -------------------- Ajustes a BDs existentes --------------------
+def actualizar_esquema():
+    """ db.create_all() crea tablas nuevas pero no altera las existentes; aquí se
+        agregan las columnas e índices que faltan en BDs creadas con versiones anteriores. """
+    columnas = {c["name"] for c in inspect(db.engine).get_columns("horario")}
+    if "version_id" not in columnas:
+        _versionar_horario()
+    _crear_indices()
+
+
+def _crear_indices():
+    """ Índices declarados en los modelos que la BD todavía no tiene. """
+    existentes = inspect(db.engine)
+    for tabla in db.metadata.sorted_tables:
+        nombres = {i["name"] for i in existentes.get_indexes(tabla.name)}
+        for indice in tabla.indexes:
+            if indice.name not in nombres:
+                indice.create(db.engine)
+
+
+def _versionar_horario():
+    """ horario sin versiones: las filas existentes pasan a ser la versión publicada. """
+    with db.engine.begin() as con:
+        con.execute(text("ALTER TABLE horario ADD COLUMN version_id INTEGER REFERENCES version_horario(id)"))
+        con.execute(text("CREATE INDEX IF NOT EXISTS ix_horario_version_id ON horario (version_id)"))
+        if con.execute(text("SELECT COUNT(*) FROM horario")).scalar():
+            ahora = datetime.now()
+            version_id = con.execute(
+                text("INSERT INTO version_horario (creada, publicada, nota) VALUES (:ahora, :ahora, :nota)"),
+                {"ahora": ahora, "nota": "horario previo a las versiones"}).lastrowid
+            con.execute(text("UPDATE horario SET version_id = :v"), {"v": version_id})
+            con.execute(text("INSERT INTO horario_activo (id, version_id) VALUES (1, :v)"), {"v": version_id})
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from app.ocupacion import mascara, bits, contar_bits
+
+
+def sin_asignar(gen):
+    g, m, d, dia, turno, ini, fin = gen
+    return not d or not dia or ini is None
+
+
+class EvaluadorIncremental:
+    """ Fitness de un individuo mantenido con conteos de ocupación por slot.
+
+        asignar(i, gen) reemplaza un gen y ajusta el puntaje en O(bloques del gen),
+        así que evaluar una mutación cuesta lo que cambió, no el tamaño del horario.
+        Los cambios quedan en una bitácora: deshacer() los revierte, confirmar() la vacía.
+        El puntaje es siempre igual a fitness(self.genes, inst). """
+
+    def __init__(self, ind, inst):
+        from app.genetico import MAX_MATERIAS_DIA_POR_GRUPO
+        self.inst = inst
+        self.max_dia = MAX_MATERIAS_DIA_POR_GRUPO
+        self.genes = list(ind)
+        self.puntaje = 0
+        self.uso_docente = defaultdict(int)      # (docente_id, bit) -> sesiones en ese slot
+        self.uso_grupo = defaultdict(int)        # (grupo_id, bit) -> sesiones en ese slot
+        self.mascara_docente = defaultdict(int)  # docente_id -> slots con al menos una sesión
+        self.mascara_grupo = defaultdict(int)    # grupo_id -> slots con al menos una sesión
+        self.por_grupo_dia = defaultdict(int)    # (grupo_id, dia) -> sesiones asignadas
+        self._bitacora = []                      # (i, gen anterior)
+        for gen in self.genes:
+            self._poner(gen)
+
+    # ---------- contabilidad de un gen ----------
+    def _poner(self, gen):
+        if sin_asignar(gen):
+            self.puntaje -= 80
+            return
+        g, m, d, dia, turno, ini, fin = gen
+        self.puntaje += 10
+        if self.por_grupo_dia[(g, dia)] >= self.max_dia:
+            self.puntaje -= 40
+        self.por_grupo_dia[(g, dia)] += 1
+        for b in bits(dia, turno, ini, fin):
+            n = self.uso_docente[(d, b)]
+            if n:
+                self.puntaje -= 25
+            else:
+                self.mascara_docente[d] |= 1 << b
+            self.uso_docente[(d, b)] = n + 1
+            n = self.uso_grupo[(g, b)]
+            if n:
+                self.puntaje -= 25
+            else:
+                self.mascara_grupo[g] |= 1 << b
+            self.uso_grupo[(g, b)] = n + 1
+        self.puntaje -= 50 * contar_bits(self.inst.reservas_mascara.get(g, 0) & mascara(dia, turno, ini, fin))
+
+    def _quitar(self, gen):
+        if sin_asignar(gen):
+            self.puntaje += 80
+            return
+        g, m, d, dia, turno, ini, fin = gen
+        self.puntaje -= 10
+        self.por_grupo_dia[(g, dia)] -= 1
+        if self.por_grupo_dia[(g, dia)] >= self.max_dia:
+            self.puntaje += 40
+        for b in bits(dia, turno, ini, fin):
+            n = self.uso_docente[(d, b)] - 1
+            if n:
+                self.puntaje += 25
+            else:
+                self.mascara_docente[d] &= ~(1 << b)
+            self.uso_docente[(d, b)] = n
+            n = self.uso_grupo[(g, b)] - 1
+            if n:
+                self.puntaje += 25
+            else:
+                self.mascara_grupo[g] &= ~(1 << b)
+            self.uso_grupo[(g, b)] = n
+        self.puntaje += 50 * contar_bits(self.inst.reservas_mascara.get(g, 0) & mascara(dia, turno, ini, fin))
+
+    # ---------- API ----------
+    def asignar(self, i, gen):
+        """ Reemplaza el gen i; devuelve el nuevo puntaje. """
+        anterior = self.genes[i]
+        if anterior == gen:
+            return self.puntaje
+        self._quitar(anterior)
+        self._poner(gen)
+        self.genes[i] = gen
+        self._bitacora.append((i, anterior))
+        return self.puntaje
+
+    def deshacer(self):
+        """ Revierte los cambios desde el último confirmar(). """
+        while self._bitacora:
+            i, anterior = self._bitacora.pop()
+            self._quitar(self.genes[i])
+            self._poner(anterior)
+            self.genes[i] = anterior
+        return self.puntaje
+
+    def confirmar(self):
+        self._bitacora.clear()
@@ -0,0 +1,114 @@
+import csv
+import io
+from datetime import timedelta, timezone
+from functools import lru_cache
+from sqlalchemy import case, select
+from app import db
+from app.constantes import DIAS, INICIO_TURNO, MINUTOS_BLOQUE
+from app.models import Horario, Materia, Docente, Grupo
+
+# Exportación del horario de una versión, en streaming: las filas salen de un cursor
+# de a FILAS_POR_LOTE (yield_per) y se escriben por tandas, así que la memoria no
+# crece con el tamaño del horario. Sólo columnas, no entidades ORM: nada se acumula
+# en el identity map de la sesión.
+FILAS_POR_LOTE = 500
+CAMPOS_CSV = ("grupo", "turno", "dia", "bloque_inicio", "bloque_fin", "hora_inicio", "hora_fin",
+              "materia", "docente")
+ORDEN_DIA = {d: i for i, d in enumerate(DIAS)}
+
+
+def horas(turno, ini, fin):
+    """ (hora de inicio, hora de fin) "HH:MM" de los bloques ini..fin de un turno. """
+    desde = INICIO_TURNO[turno] + (ini - 1) * MINUTOS_BLOQUE
+    hasta = INICIO_TURNO[turno] + fin * MINUTOS_BLOQUE
+    return f"{desde // 60:02d}:{desde % 60:02d}", f"{hasta // 60:02d}:{hasta % 60:02d}"
+
+
+def _lotes(version_id, grupo_id=None, docente_id=None, turno=None):
+    """ Listas de filas (id, grupo, turno, dia, ini, fin, materia, docente) de la
+        versión, por grupo, día y bloque. """
+    q = (select(Horario.id, Grupo.nombre, Horario.turno, Horario.dia, Horario.bloque_inicio,
+                Horario.bloque_fin, Materia.nombre, Docente.nombre)
+         .join(Grupo, Horario.grupo_id == Grupo.id)
+         .join(Materia, Horario.materia_id == Materia.id)
+         .join(Docente, Horario.docente_id == Docente.id)
+         .where(Horario.version_id == version_id))
+    if grupo_id is not None:
+        q = q.where(Horario.grupo_id == grupo_id)
+    if docente_id is not None:
+        q = q.where(Horario.docente_id == docente_id)
+    if turno is not None:
+        q = q.where(Horario.turno == turno)
+    q = q.order_by(Grupo.nombre, case(ORDEN_DIA, value=Horario.dia), Horario.bloque_inicio)
+    return db.session.execute(q.execution_options(yield_per=FILAS_POR_LOTE)).partitions()
+
+
+# -------------------- CSV --------------------
+def csv_texto(version_id, **filtros):
+    """ Genera el CSV (encabezado CAMPOS_CSV) de a un lote de filas por trozo. """
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(CAMPOS_CSV)
+    for lote in _lotes(version_id, **filtros):
+        for _, grupo, turno, dia, ini, fin, materia, docente in lote:
+            escritor.writerow((grupo, turno.value, dia, ini, fin) + horas(turno, ini, fin) + (materia, docente))
+        yield salida.getvalue()
+        salida.seek(0)
+        salida.truncate()
+    yield salida.getvalue()
+
+
+# -------------------- iCalendar (RFC 5545) --------------------
+@lru_cache(maxsize=4096)
+def _escapar(texto):
+    return (texto.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _plegar(linea):
+    """ Línea de contenido partida en tramos de hasta 75 octetos (RFC 5545 §3.1),
+        sin cortar un carácter UTF-8 multibyte. """
+    datos = linea.encode("utf-8")
+    if len(datos) <= 75:
+        return linea + "\r\n"
+    partes, i, tam = [], 0, 75
+    while i < len(datos):
+        fin = min(i + tam, len(datos))
+        while fin < len(datos) and datos[fin] & 0xC0 == 0x80:  # byte de continuación
+            fin -= 1
+        partes.append(datos[i:fin])
+        i, tam = fin, 74  # las líneas de continuación empiezan con un espacio
+    return b"\r\n ".join(partes).decode("utf-8") + "\r\n"
+
+
+@lru_cache(maxsize=4096)
+def _fecha_hora(dia, minutos):
+    return f"{dia:%Y%m%d}T{minutos // 60:02d}{minutos % 60:02d}00"
+
+
+def ical_texto(version_id, creada, desde, hasta=None, nombre="Horario", **filtros):
+    """ Genera un VCALENDAR con un evento semanal (RRULE) por sesión: la primera
+        ocurrencia es el día de la semana de la sesión en o después de `desde`; sin
+        `hasta`, se repite sin fin. Horas locales "flotantes" (sin zona), como las
+        del reloj de la escuela. """
+    dtstamp = f"{creada.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+    regla = "RRULE:FREQ=WEEKLY" + (f";UNTIL={hasta:%Y%m%d}T235959" if hasta else "")
+    primera = {d: desde + timedelta(days=(i - desde.weekday()) % 7) for d, i in ORDEN_DIA.items()}
+    yield ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//horarios//exportacion//ES\r\n"
+           "CALSCALE:GREGORIAN\r\n" + _plegar(f"X-WR-CALNAME:{_escapar(nombre)}"))
+    for lote in _lotes(version_id, **filtros):
+        trozo = []
+        for hid, grupo, turno, dia, ini, fin, materia, docente in lote:
+            inicio = INICIO_TURNO[turno] + (ini - 1) * MINUTOS_BLOQUE
+            trozo += ["BEGIN:VEVENT\r\n",
+                      _plegar(f"UID:horario-{version_id}-{hid}@horarios"),
+                      f"DTSTAMP:{dtstamp}\r\n",
+                      f"DTSTART:{_fecha_hora(primera[dia], inicio)}\r\n",
+                      f"DTEND:{_fecha_hora(primera[dia], inicio + (fin - ini + 1) * MINUTOS_BLOQUE)}\r\n",
+                      regla + "\r\n",
+                      _plegar(f"SUMMARY:{_escapar(materia)} ({_escapar(grupo)})"),
+                      _plegar(f"DESCRIPTION:{_escapar(f'Docente: {docente}')}\\n"
+                              f"{_escapar(f'Grupo: {grupo}, turno {turno.value}, bloques {ini}-{fin}')}"),
+                      "END:VEVENT\r\n"]
+        yield "".join(trozo)
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,148 @@
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se usa fitness() individuo por individuo
+    np = None
+
+from app.constantes import DIAS
+from app.genetico import MAX_MATERIAS_DIA_POR_GRUPO
+from app.ocupacion import BLOQUES_POR_TURNO, IDX_DIA, IDX_TURNO, slots
+
+DISPONIBLE = np is not None
+
+# columnas del arreglo (tam, n_sesiones, CAMPOS)
+GRUPO, DOCENTE, DIA, TURNO, INI, FIN = range(6)
+CAMPOS = 6
+
+
+# -------------------- Codificación --------------------
+class _Genes:
+    """ Traducción gen -> fila de enteros, compartida entre las llamadas de una corrida:
+        de una generación a la siguiente casi todos los genes se repiten, así que
+        cada uno se traduce una sola vez. Se vacía si pasa de MAX_GENES. """
+    MAX_GENES = 50_000
+
+    def __init__(self, inst):
+        self.inst = inst
+        self.vaciar()
+
+    def vaciar(self):
+        self.numero = {}
+        self.filas = [(-1,) * CAMPOS]  # fila 0: relleno de individuos más cortos
+        self.tabla = np.array(self.filas, dtype=np.int32)
+
+    def traducir(self, gen):
+        g, m, d, dia, turno, ini, fin = gen
+        inst = self.inst
+        # mismo criterio que fitness(): sin docente, día o inicio = sin asignar
+        if d and dia and ini is not None:
+            self.filas.append((inst.idx_grupo[g], inst.idx_docente[d], IDX_DIA[dia], IDX_TURNO[turno], ini, fin))
+        else:
+            self.filas.append((inst.idx_grupo[g], -1, -1, IDX_TURNO[turno], -1, -1))
+        self.numero[gen] = n = len(self.filas) - 1
+        return n
+
+    def arreglo(self):
+        """ Tabla numpy con todas las filas traducidas hasta ahora. """
+        if len(self.tabla) < len(self.filas):
+            nuevas = np.array(self.filas[len(self.tabla):], dtype=np.int32)
+            self.tabla = np.concatenate((self.tabla, nuevas))
+        return self.tabla
+
+
+@lru_cache(maxsize=2)
+def _genes(inst):
+    return _Genes(inst)
+
+
+def codificar(poblacion, inst):
+    """ Población de tuplas -> arreglo int32 (tam, n_sesiones, CAMPOS).
+        Índices densos de la Instancia; -1 donde la sesión no está asignada.
+        Cada gen se busca en la tabla de _Genes y la población se arma indexando
+        esa tabla con un solo arreglo de números de gen (escribir celda por celda
+        desde Python costaba más que evaluar). """
+    tam = len(poblacion)
+    n = max((len(ind) for ind in poblacion), default=0)
+    genes = _genes(inst)
+    if len(genes.filas) > genes.MAX_GENES:
+        genes.vaciar()
+    numero, traducir = genes.numero, genes.traducir
+    plano = []
+    for ind in poblacion:
+        plano.extend([numero.get(gen) or traducir(gen) for gen in ind])
+        plano.extend([0] * (n - len(ind)))
+    return genes.arreglo()[np.array(plano, dtype=np.intp)].reshape(tam, n, CAMPOS)
+
+
+@lru_cache(maxsize=8)
+def _reservas(inst):
+    """ Arreglo booleano (n_grupos, 5, n_turnos, BLOQUES_POR_TURNO) de los bloques reservados. """
+    res = np.zeros((len(inst.grupos), len(DIAS), len(IDX_TURNO), BLOQUES_POR_TURNO), dtype=bool)
+    for g, m in inst.reservas_mascara.items():
+        for (dia, turno, b) in slots(m):
+            res[inst.idx_grupo[g], IDX_DIA[dia], IDX_TURNO[turno], b - 1] = True
+    return res
+
+
+def _excedentes(claves, tam, minlength):
+    """ Por individuo: sum(max(0, ocupación - 1)) sobre cada celda de ocupación.
+        claves: índice lineal individuo * minlength + celda. Sólo se recorren las
+        celdas repetidas, no las tam * minlength posibles. """
+    conteo = np.bincount(claves)
+    repetidas = np.flatnonzero(conteo > 1)
+    return np.bincount(repetidas // minlength, weights=conteo[repetidas] - 1, minlength=tam).astype(np.int64)
+
+
+# -------------------- Evaluación --------------------
+def fitness_lote(poblacion, inst):
+    """ Evalúa toda la población de una vez; devuelve una lista de puntajes
+        idéntica a [fitness(ind, inst) for ind in poblacion]. """
+    if not poblacion:
+        return []
+    arr = codificar(poblacion, inst)
+    tam = arr.shape[0]
+    g, d, dia, t = arr[..., GRUPO], arr[..., DOCENTE], arr[..., DIA], arr[..., TURNO]
+    ini, fin = arr[..., INI], arr[..., FIN]
+
+    asignada = d >= 0
+    n_asig = asignada.sum(axis=1)
+    largo = np.array([len(ind) for ind in poblacion])
+    score = 10 * n_asig - 80 * (largo - n_asig)
+
+    nb = BLOQUES_POR_TURNO
+    n_turnos = len(IDX_TURNO)
+    celdas = len(DIAS) * n_turnos * nb
+    n_grupos = len(inst.grupos)
+    n_docentes = max(len(inst.docentes), 1)
+
+    # materias por (grupo, dia): -40 por cada sesión más allá del máximo
+    pi, sj = np.nonzero(asignada)
+    clave_gd = pi * (n_grupos * len(DIAS)) + g[pi, sj] * len(DIAS) + dia[pi, sj]
+    conteo_gd = np.bincount(clave_gd, minlength=tam * n_grupos * len(DIAS)).reshape(tam, -1)
+    score -= 40 * np.maximum(conteo_gd - MAX_MATERIAS_DIA_POR_GRUPO, 0).sum(axis=1)
+
+    # expandir cada sesión asignada a sus bloques ini..fin
+    dur = np.maximum(fin - ini + 1, 0)[pi, sj]
+    rep = np.repeat(np.arange(len(pi)), dur)
+    offset = np.arange(len(rep)) - np.repeat(np.cumsum(dur) - dur, dur)
+    p_b = pi[rep]
+    s_b = sj[rep]
+    bloque = ini[p_b, s_b] + offset
+    # igual que ocupacion.mascara(): bloques fuera de 1..BLOQUES_POR_TURNO no ocupan slot
+    dentro = (bloque >= 1) & (bloque <= nb)
+    p_b, s_b, bloque = p_b[dentro], s_b[dentro], bloque[dentro]
+    celda = (dia[p_b, s_b] * n_turnos + t[p_b, s_b]) * nb + (bloque - 1)
+    g_b = g[p_b, s_b].astype(np.int64)
+    d_b = d[p_b, s_b].astype(np.int64)
+    p_b = p_b.astype(np.int64)
+
+    # docente duplicado / choque en grupo: -25 por cada ocupación repetida
+    score -= 25 * _excedentes((p_b * n_docentes + d_b) * celdas + celda, tam, n_docentes * celdas)
+    score -= 25 * _excedentes((p_b * n_grupos + g_b) * celdas + celda, tam, n_grupos * celdas)
+
+    # pisa reserva: -50 por bloque
+    reservado = _reservas(inst).reshape(-1)[g_b * celdas + celda]
+    score -= 50 * np.bincount(p_b[reservado], minlength=tam)
+
+    return score.astype(int).tolist()
@@ -1,142 +1,160 @@
+import heapq
 import random
+import time
 from collections import defaultdict
-from app import db
-from app.models import (
-    Docente, Materia, DocenteMateria, Disponibilidad, ReservaModulo, Horario,
-    Grupo, MateriaGrupo, DIAS, Turno
-)
+from dataclasses import dataclass
+from app.constantes import DIAS
+from app.instancia import cargar_instancia
+from app.cache_fitness import CacheFitness
+from app.telemetria import Telemetria, publicar as publicar_telemetria
+from app.evaluador import EvaluadorIncremental
+from app.dominios import dominios, elegir, elegir_compacta, elegir_docente, sin_dominio
+from app.ocupacion import BLOQUES_POR_TURNO, MASCARA_DIA, mascara, bits, contar_bits
 
-BLOQUES_POR_TURNO = 8
 MAX_MATERIAS_DIA_POR_GRUPO = 4  # 4 materias por día
 
-# -------------------- Utilitarios --------------------
-def reservas_indexadas():
-    """ Rslots: set (grupo_id, dia, turno, b)
-        Rrangos: dict[(grupo_id, materia_id, dia)] = (ini, fin) """
-    Rslots = set()
-    Rrangos = {}
-    for r in ReservaModulo.query.all():
-        for b in range(r.bloque_inicio, r.bloque_fin + 1):
-            Rslots.add((r.grupo_id, r.dia, r.turno, b))
-        Rrangos[(r.grupo_id, r.materia_id, r.dia)] = (r.bloque_inicio, r.bloque_fin)
-    return Rslots, Rrangos
-
-def disponibilidad_por_docente(docente_id):
-    d = Docente.query.get(docente_id)
-    slots = set()
-    for disp in d.disponibilidades:
-        for b in range(disp.bloque_inicio, disp.bloque_fin + 1):
-            slots.add((disp.dia, disp.turno, b))
-    return slots
-
-def docentes_para_materia(materia_id):
-    return [dm.docente for dm in DocenteMateria.query.filter_by(materia_id=materia_id).all()]
-
-def sesiones_requeridas():
-    """ lista de tareas: (grupo_id, materia_id, turno, bloques) repetidas por sesiones_semana """
-    tareas = []
-    for mg in MateriaGrupo.query.all():
-        m = Materia.query.get(mg.materia_id)
-        for _ in range(mg.sesiones_semana):
-            tareas.append({"grupo_id": mg.grupo_id, "materia_id": mg.materia_id, "turno": m.turno, "bloques": m.bloques_duracion})
-    return tareas
+def _dias_llenos(g, por_grupo_dia):
+    """ Máscara de los días en que el grupo ya tiene el máximo de materias. """
+    llenos = 0
+    for dia in DIAS:
+        if por_grupo_dia[(g, dia)] >= MAX_MATERIAS_DIA_POR_GRUPO:
+            llenos |= MASCARA_DIA[dia]
+    return llenos
 
 # -------------------- Individuo --------------------
-def generar_individuo():
-    """ lista de tuplas: (grupo_id, materia_id, docente_id|None, dia|None, turno, ini|None, fin|None) """
-    Rslots, Rrangos = reservas_indexadas()
-    base = [(t["grupo_id"], t["materia_id"], None, None, t["turno"], None, None) for t in sesiones_requeridas()]
-
-    # Preasignar reservas
-    individuo = []
-    for (g, m, d, dia, turno, ini, fin) in base:
-        reservas_para = [(k, v) for (k, v) in Rrangos.items() if k[0] == g and k[1] == m]
-        if reservas_para:
-            rkey, (ini_r, fin_r) = reservas_para.pop(0)
-            dia_fijo = rkey[2]
-            individuo.append((g, m, None, dia_fijo, turno, ini_r, fin_r))
-            Rrangos.pop(rkey, None)
-        else:
-            individuo.append((g, m, None, None, turno, None, None))
+CONSTRUCTORES = ("plan", "restringido")
+
+def generar_individuo(inst=None, rng=None, constructor="plan"):
+    """ lista de tuplas: (grupo_id, materia_id, docente_id|None, dia|None, turno, ini|None, fin|None)
+        Trabaja sobre la Instancia en memoria; sin ella la carga de la BD.
+        Cada sesión va a su reserva si le queda una; si no, a una opción al azar de
+        su dominio (ver dominios.dominios) que no choque en el individuo.
+        constructor "plan": las sesiones se ubican en el orden del plan (inst.sesiones);
+        "restringido": primero la más restringida (ver _construir_restringido).
+        rng: random.Random propio (reproducible por individuo); por defecto el global. """
+    if constructor not in CONSTRUCTORES:
+        raise ValueError(f"Constructor desconocido: {constructor}")
+    if inst is None:
+        inst = cargar_instancia()
+    if rng is None:
+        rng = random
+    dom = dominios(inst)
 
-    uso_docente = set()                 # (docente_id, dia, turno, b)
-    uso_grupo_bloques = set()           # (grupo_id, dia, turno, b)
+    # Preasignar reservas: la k-ésima sesión de (g, m) toma la k-ésima reserva
+    usadas = defaultdict(int)
+    fijas = []
+    for (g, m, turno) in inst.sesiones:
+        reservas = dom[(g, m)].reservas
+        k = usadas[(g, m)]
+        usadas[(g, m)] += 1
+        fijas.append(reservas[k] if k < len(reservas) else None)
+
+    uso_grupo_bloques = defaultdict(int)  # grupo_id -> máscara de slots ocupados
     materias_por_grupo_dia = defaultdict(int)
 
     # ocupar bloques reservados (sin docente aún)
-    for (g, m, d, dia, turno, ini, fin) in individuo:
-        if dia and ini is not None:
-            for b in range(ini, fin + 1):
-                uso_grupo_bloques.add((g, dia, turno, b))
-            materias_por_grupo_dia[(g, dia)] += 1
+    for (g, m, turno), fija in zip(inst.sesiones, fijas):
+        if fija:
+            uso_grupo_bloques[g] |= fija.tramo
+            materias_por_grupo_dia[(g, fija.dia)] += 1
+
+    if constructor == "restringido":
+        return _construir_restringido(inst, dom, fijas, uso_grupo_bloques, materias_por_grupo_dia, rng)
 
+    uso_docente = defaultdict(int)      # docente_id -> máscara de slots ocupados
     asignado = []
-    for (g, m, d, dia, turno, ini, fin) in individuo:
+    for (g, m, turno), fija in zip(inst.sesiones, fijas):
         # reservado: elegimos docente
-        if dia and ini is not None:
-            candidatos = docentes_para_materia(m)
-            random.shuffle(candidatos)
-            elegido = None
-            for doc in candidatos:
-                dslots = disponibilidad_por_docente(doc.id)
-                ok = all((dia, turno, b) in dslots for b in range(ini, fin + 1))
-                ok = ok and all((doc.id, dia, turno, b) not in uso_docente for b in range(ini, fin + 1))
-                if ok:
-                    elegido = doc.id
-                    break
-            asignado.append((g, m, elegido, dia, turno, ini, fin))
+        if fija:
+            elegido = elegir_docente(fija, uso_docente, rng)
+            asignado.append((g, m, elegido, fija.dia, turno, fija.ini, fija.fin))
             if elegido:
-                for b in range(ini, fin + 1):
-                    uso_docente.add((elegido, dia, turno, b))
+                uso_docente[elegido] |= fija.tramo
             continue
 
-        # sin reserva: ubicar
-        candidatos = docentes_para_materia(m)
-        random.shuffle(candidatos)
-        placed = False
+        # sin reserva: ubicar en una opción libre del dominio
+        ocupado = uso_grupo_bloques[g] | _dias_llenos(g, materias_por_grupo_dia)
+        eleccion = elegir(dom[(g, m)].libres, ocupado, uso_docente, rng)
+        if eleccion is None:
+            asignado.append((g, m, None, None, turno, None, None))
+            continue
+        op, doc = eleccion
+        asignado.append((g, m, doc, op.dia, turno, op.ini, op.fin))
+        uso_grupo_bloques[g] |= op.tramo
+        uso_docente[doc] |= op.tramo
+        materias_por_grupo_dia[(g, op.dia)] += 1
 
-        dias_barajados = DIAS[:]
-        random.shuffle(dias_barajados)
-        dur = Materia.query.get(m).bloques_duracion
-        for dia_try in dias_barajados:
-            if materias_por_grupo_dia[(g, dia_try)] >= MAX_MATERIAS_DIA_POR_GRUPO:
-                continue
-            inicios = list(range(1, BLOQUES_POR_TURNO - dur + 2))
-            random.shuffle(inicios)
-            for ini_try in inicios:
-                fin_try = ini_try + dur - 1
-                # no pisar reservas o clases del grupo
-                if any((g, dia_try, turno, b) in Rslots for b in range(ini_try, fin_try + 1)):
-                    continue
-                if any((g, dia_try, turno, b) in uso_grupo_bloques for b in range(ini_try, fin_try + 1)):
-                    continue
-                # docente disponible
-                for doc in candidatos:
-                    dslots = disponibilidad_por_docente(doc.id)
-                    if all((dia_try, turno, b) in dslots for b in range(ini_try, fin_try + 1)) and \
-                       all((doc.id, dia_try, turno, b) not in uso_docente for b in range(ini_try, fin_try + 1)):
-                        asignado.append((g, m, doc.id, dia_try, turno, ini_try, fin_try))
-                        for b in range(ini_try, fin_try + 1):
-                            uso_grupo_bloques.add((g, dia_try, turno, b))
-                            uso_docente.add((doc.id, dia_try, turno, b))
-                        materias_por_grupo_dia[(g, dia_try)] += 1
-                        placed = True
-                        break
-                if placed:
-                    break
-            if placed:
-                break
+    return asignado
 
-        if not placed:
-            asignado.append((g, m, None, None, turno, None, None))
+def _construir_restringido(inst, dom, fijas, uso_grupo_bloques, materias_por_grupo_dia, rng):
+    """ Orden dinámico por saturación, al estilo DSATUR: en cada paso se ubica la
+        sesión pendiente con menos pares (opción, docente) todavía factibles (una
+        sesión con reserva cuenta los docentes libres en su tramo); los empates se
+        sortean. Al ubicar una sesión se recuentan sólo las pendientes que pudo
+        afectar: las de su grupo y las que su docente puede dar en ese turno. El
+        tramo se elige con dominios.elegir_compacta para no fragmentar el grupo. """
+    uso_docente = defaultdict(int)
+    afectadas = defaultdict(set)        # ("g", g) / ("d", d, turno) -> sesiones que dependen de él
+    for i, (g, m, turno) in enumerate(inst.sesiones):
+        if not fijas[i]:
+            afectadas[("g", g)].add(i)
+        for d in (fijas[i].docentes if fijas[i] else inst.docentes_por_materia.get(m, ())):
+            afectadas[("d", d, turno)].add(i)
+
+    def factibles(i):
+        g, m, turno = inst.sesiones[i]
+        fija = fijas[i]
+        if fija:
+            return sum(1 for d in fija.docentes if not uso_docente[d] & fija.tramo)
+        ocupado = uso_grupo_bloques[g] | _dias_llenos(g, materias_por_grupo_dia)
+        return sum(1 for op in dom[(g, m)].libres if not ocupado & op.tramo
+                   for d in op.docentes if not uso_docente[d] & op.tramo)
+
+    asignado = [None] * len(inst.sesiones)
+    conteo = [factibles(i) for i in range(len(inst.sesiones))]
+    monticulo = [(k, rng.random(), i) for i, k in enumerate(conteo)]
+    heapq.heapify(monticulo)
+    while monticulo:
+        k, _, i = heapq.heappop(monticulo)
+        if asignado[i] is not None or k != conteo[i]:
+            continue                            # ya ubicada o entrada vieja
+        g, m, turno = inst.sesiones[i]
+        fija = fijas[i]
+        if fija:
+            doc = elegir_docente(fija, uso_docente, rng)
+            asignado[i] = (g, m, doc, fija.dia, turno, fija.ini, fija.fin)
+            if doc is None:
+                continue
+            uso_docente[doc] |= fija.tramo
+            recontar = afectadas[("d", doc, turno)]
+        else:
+            ocupado = uso_grupo_bloques[g] | _dias_llenos(g, materias_por_grupo_dia)
+            eleccion = elegir_compacta(dom[(g, m)].libres, ocupado, uso_docente, rng)
+            if eleccion is None:
+                asignado[i] = (g, m, None, None, turno, None, None)
+                continue
+            op, doc = eleccion
+            asignado[i] = (g, m, doc, op.dia, turno, op.ini, op.fin)
+            uso_grupo_bloques[g] |= op.tramo
+            uso_docente[doc] |= op.tramo
+            materias_por_grupo_dia[(g, op.dia)] += 1
+            recontar = afectadas[("g", g)] | afectadas[("d", doc, turno)]
+        for j in recontar:
+            if asignado[j] is None:
+                nuevo = factibles(j)
+                if nuevo != conteo[j]:
+                    conteo[j] = nuevo
+                    heapq.heappush(monticulo, (nuevo, rng.random(), j))
 
     return asignado
 
-def fitness(ind):
+def fitness(ind, inst=None):
+    if inst is None:
+        inst = cargar_instancia()
     score = 0
-    Rslots, _ = reservas_indexadas()
-    uso_docente = set()
-    uso_grupo_bloques = set()
+    Rmask = inst.reservas_mascara
+    uso_docente = defaultdict(int)
+    uso_grupo_bloques = defaultdict(int)
     materias_por_grupo_dia = defaultdict(int)
 
     for (g, m, d, dia, turno, ini, fin) in ind:
@@ -147,53 +165,475 @@ def fitness(ind):
         if materias_por_grupo_dia[(g, dia)] >= MAX_MATERIAS_DIA_POR_GRUPO:
             score -= 40
 
-        for b in range(ini, fin + 1):
-            if (d, dia, turno, b) in uso_docente:
-                score -= 25  # docente duplicado
-            else:
-                uso_docente.add((d, dia, turno, b))
-
-            if (g, dia, turno, b) in uso_grupo_bloques:
-                score -= 25  # choque en grupo
-            else:
-                uso_grupo_bloques.add((g, dia, turno, b))
-
-            if (g, dia, turno, b) in Rslots:
-                score -= 50  # pisa reserva
+        tramo = mascara(dia, turno, ini, fin)
+        score -= 25 * contar_bits(uso_docente[d] & tramo)  # docente duplicado
+        uso_docente[d] |= tramo
+        score -= 25 * contar_bits(uso_grupo_bloques[g] & tramo)  # choque en grupo
+        uso_grupo_bloques[g] |= tramo
+        score -= 50 * contar_bits(Rmask.get(g, 0) & tramo)  # pisa reserva
 
         materias_por_grupo_dia[(g, dia)] += 1
         score += 10  # premio por sesión válida
 
     return score
 
-def mutar(ind, p=0.15):
-    nuevo = []
-    for (g, m, d, dia, turno, ini, fin) in ind:
+def evaluar_poblacion(poblacion, inst, cache=None):
+    """ Puntajes de toda la población; con numpy se evalúa en lote.
+        Con cache sólo se evalúan los cromosomas que no estén memorizados. """
+    from app import fitness_lote
+    evaluar = fitness_lote.fitness_lote if fitness_lote.DISPONIBLE else \
+        (lambda pob, inst: [fitness(ind, inst) for ind in pob])
+    if cache is None:
+        return evaluar(poblacion, inst)
+
+    claves = [cache.clave(ind) for ind in poblacion]
+    puntajes = [cache.obtener(k) for k in claves]
+    pendientes = {}                     # clave -> índice del primer individuo con ella
+    for i, k in enumerate(claves):
+        if puntajes[i] is None and k not in pendientes:
+            pendientes[k] = i
+    if pendientes:
+        nuevos = evaluar([poblacion[i] for i in pendientes.values()], inst)
+        for k, puntaje in zip(pendientes, nuevos):
+            cache.guardar(k, puntaje)
+        calculados = dict(zip(pendientes, nuevos))
+        puntajes = [calculados[k] if p is None else p for k, p in zip(claves, puntajes)]
+    return puntajes
+
+MUTACIONES = ("reiniciar", "reparar")
+
+def mutar(ind, p=0.15, evaluador=None, modo="reiniciar", inst=None):
+    """ modo "reiniciar": el gen queda sin asignar (-80) hasta que otra mutación lo toque.
+        modo "reparar": libera los genes elegidos y reubica voraz cada sesión sin asignar
+        en un hueco factible del propio individuo; requiere inst.
+        evaluador: EvaluadorIncremental en el estado de ind; recibe sólo los genes
+        cambiados, así que al terminar evaluador.puntaje es el fitness del hijo.
+        El hijo comparte con el padre las tuplas de los genes que no cambian. """
+    if modo not in MUTACIONES:
+        raise ValueError(f"Modo de mutación desconocido: {modo}")
+    nuevo = list(ind)
+    for i, (g, m, d, dia, turno, ini, fin) in enumerate(ind):
         if random.random() < p:
-            nuevo.append((g, m, None, None, turno, None, None))  # reubicar en generación futura
-        else:
-            nuevo.append((g, m, d, dia, turno, ini, fin))
+            nuevo[i] = (g, m, None, None, turno, None, None)  # reubicar en generación futura
+            if evaluador is not None:
+                evaluador.asignar(i, nuevo[i])
+    if modo == "reparar":
+        if evaluador is None:
+            evaluador = EvaluadorIncremental(nuevo, inst)
+        reparar(nuevo, inst, evaluador)
     return nuevo
 
-def generar_horario(generaciones=60, tam=30, elite=6):
-    poblacion = [generar_individuo() for _ in range(tam)]
-    for _ in range(generaciones):
-        poblacion.sort(key=fitness, reverse=True)
-        nueva = poblacion[:elite]
-        while len(nueva) < tam:
-            padre = random.choice(poblacion[:elite])
-            nueva.append(mutar(padre, p=0.20))
+def reparar(ind, inst, ev, indices=None):
+    """ Reubica in situ las sesiones sin asignar de ind usando la ocupación de ev
+        (que debe reflejar ind). Primero un tramo libre del dominio; si no queda
+        ninguno, la reserva propia de (g, m), sólo si mejora el puntaje: fitness cobra
+        -50 por bloque reservado también a la sesión que ocupa su propia reserva.
+        indices: revisar sólo esas posiciones (None = todas). """
+    for i in range(len(ind)) if indices is None else indices:
+        g, m, d, dia, turno, ini, fin = ind[i]
+        if d and dia and ini is not None:
+            continue
+        dom = dominios(inst)[(g, m)]
+        previo = ev.puntaje
+        gen = _reubicar_libre(g, m, turno, dom, ev) or _reubicar_reserva(g, m, turno, dom, ev)
+        if gen is None:
+            continue
+        if ev.asignar(i, gen) > previo:
+            ind[i] = gen
+        else:
+            ev.asignar(i, ind[i])  # la reserva propia resta más que dejarla sin asignar
+
+def _reubicar_reserva(g, m, turno, dom, ev):
+    """ Si (g, m) tiene una reserva cuyo tramo quedó libre en el grupo, la sesión vuelve ahí. """
+    for op in dom.reservas:
+        if ev.mascara_grupo[g] & op.tramo:
+            continue
+        doc = elegir_docente(op, ev.mascara_docente, random)
+        if doc is not None:
+            return (g, m, doc, op.dia, turno, op.ini, op.fin)
+    return None
+
+def _reubicar_libre(g, m, turno, dom, ev):
+    ocupado = ev.mascara_grupo[g] | _dias_llenos(g, ev.por_grupo_dia)
+    eleccion = elegir(dom.libres, ocupado, ev.mascara_docente, random)
+    if eleccion is None:
+        return None
+    op, doc = eleccion
+    return (g, m, doc, op.dia, turno, op.ini, op.fin)
+
+# -------------------- Cruce / Selección --------------------
+CRUCES = ("grupo", "turno")
+SELECCIONES = ("torneo", "ruleta")
+
+def seleccionar(puntajes, metodo="torneo", k=3):
+    """ Índice del padre elegido. "ruleta" desplaza los puntajes (que pueden ser
+        negativos) para que el peor tenga peso 1. """
+    if metodo == "torneo":
+        return max(random.sample(range(len(puntajes)), min(k, len(puntajes))), key=puntajes.__getitem__)
+    if metodo == "ruleta":
+        minimo = min(puntajes)
+        return random.choices(range(len(puntajes)), weights=[p - minimo + 1 for p in puntajes])[0]
+    raise ValueError(f"Método de selección desconocido: {metodo}")
+
+def cruzar(a, b, modo="grupo"):
+    """ Hijo que hereda bloques completos de uno u otro padre: todas las sesiones de
+        cada grupo ("grupo") o de cada turno ("turno"). Los genes están alineados por
+        índice porque ambos padres salen de la misma Instancia. """
+    if modo not in CRUCES:
+        raise ValueError(f"Modo de cruce desconocido: {modo}")
+    campo = 0 if modo == "grupo" else 4
+    de_a = {}
+    hijo = []
+    for ga, gb in zip(a, b):
+        clave = ga[campo]
+        if clave not in de_a:
+            de_a[clave] = random.random() < 0.5
+        hijo.append(ga if de_a[clave] else gb)
+    return hijo
+
+def liberar_choques(ind, ev):
+    """ Libera (en ind y ev) las sesiones que comparten slot de docente o de grupo
+        con otra anterior; la primera de cada choque se conserva. """
+    docentes, grupos = set(), set()  # slots de las sesiones en choque ya conservadas
+    for i, (g, m, d, dia, turno, ini, fin) in enumerate(ind):
+        if not d or not dia or ini is None:
+            continue
+        tramo = bits(dia, turno, ini, fin)
+        if not any(ev.uso_docente[(d, b)] > 1 or ev.uso_grupo[(g, b)] > 1 for b in tramo):
+            continue
+        if any((d, b) in docentes or (g, b) in grupos for b in tramo):
+            ind[i] = (g, m, None, None, turno, None, None)
+            ev.asignar(i, ind[i])
+        else:
+            docentes.update((d, b) for b in tramo)
+            grupos.update((g, b) for b in tramo)
+
+def poblacion_inicial(inst, tam, semilla=None, procesos=1, constructor="plan"):
+    """ tam individuos; el i-ésimo usa random.Random(f"{semilla}:{i}"), así que la
+        población depende sólo de la semilla y no de cuántos procesos la construyen.
+        semilla None = una tomada del random global. constructor: ver generar_individuo(). """
+    if semilla is None:
+        semilla = random.randrange(2 ** 32)
+    if procesos > 1 and tam > 1:
+        from app.paralelo import poblacion_paralela
+        return poblacion_paralela(inst, tam, semilla, procesos, constructor)
+    return [generar_individuo(inst, random.Random(f"{semilla}:{i}"), constructor) for i in range(tam)]
+
+# -------------------- Arranque desde un horario guardado --------------------
+def individuo_desde_horario(inst, filas):
+    """ Individuo con las sesiones de un horario guardado, filas de
+        (grupo_id, materia_id, docente_id, dia, turno, ini, fin). Las que ya no valen
+        con el catálogo actual (fuera del plan, otro turno o duración, docente no
+        habilitado o no disponible, reserva ajena, choque) se descartan y esas
+        sesiones se reubican con reparar(). """
+    ind, ev, _ = cargar_horario(inst, filas)
+    reparar(ind, inst, ev)
+    return ind
+
+def cargar_horario(inst, filas):
+    """ Como individuo_desde_horario() pero sin reubicar: devuelve (ind, ev,
+        descartadas), con las sesiones inválidas o sin fila sin asignar en ind, ev
+        reflejando ind y descartadas = {i: fila guardada que se descartó}. """
+    guardadas = defaultdict(list)                 # (g, m) -> filas aún sin usar
+    for g, m, d, dia, turno, ini, fin in sorted(filas):
+        guardadas[(g, m)].append((d, dia, turno, ini, fin))
+    ind = [(g, m, None, None, turno, None, None) for g, m, turno in inst.sesiones]
+    ev = EvaluadorIncremental(ind, inst)
+    descartadas = {}
+    for i, (g, m, turno) in enumerate(inst.sesiones):
+        while guardadas[(g, m)]:
+            d, dia, t, ini, fin = guardadas[(g, m)].pop(0)
+            if t == turno and _sesion_valida(inst, ev, g, m, d, dia, turno, ini, fin):
+                ind[i] = (g, m, d, dia, turno, ini, fin)
+                ev.asignar(i, ind[i])
+                descartadas.pop(i, None)
+                break
+            descartadas.setdefault(i, (g, m, d, dia, t, ini, fin))
+    ev.confirmar()
+    return ind, ev, descartadas
+
+def _sesion_valida(inst, ev, g, m, d, dia, turno, ini, fin):
+    if d not in inst.docentes_por_materia.get(m, ()) or dia not in DIAS:
+        return False
+    if fin - ini + 1 != inst.duracion[m] or ini < 1 or fin > BLOQUES_POR_TURNO:
+        return False
+    tramo = mascara(dia, turno, ini, fin)
+    reservado = inst.reservas_mascara.get(g, 0)
+    propia = inst.reservas_rangos.get((g, m, dia))
+    if propia:
+        reservado &= ~mascara(dia, turno, *propia)
+    if inst.disponibilidad.get(d, 0) & tramo != tramo or reservado & tramo:
+        return False
+    if ev.mascara_grupo[g] & tramo or ev.mascara_docente[d] & tramo:
+        return False
+    return ev.por_grupo_dia[(g, dia)] < MAX_MATERIAS_DIA_POR_GRUPO
+
+def poblacion_desde(inst, base, tam, fraccion=0.5, semilla=None, procesos=1, constructor="plan"):
+    """ Población que arranca de `base`: base misma, variantes mutadas (modo
+        "reparar") hasta completar fraccion*tam, y el resto aleatorio para no
+        perder diversidad. """
+    n = max(1, min(tam, round(tam * fraccion)))
+    poblacion = [list(base)]
+    while len(poblacion) < n:
+        poblacion.append(mutar(base, p=0.20, modo="reparar", inst=inst))
+    if tam > n:
+        poblacion += poblacion_inicial(inst, tam - n, semilla, procesos, constructor)
+    return poblacion
+
+# -------------------- Evolución --------------------
+@dataclass
+class ResultadoAG:
+    """ poblacion / puntajes: población final, de mejor a peor.
+        historial[k]: mejor puntaje al inicio de la generación k; el último elemento
+        es el de la población final.
+        generaciones: generaciones realmente corridas.
+        motivo: por qué se detuvo ("generaciones", "objetivo", "estancamiento", "tiempo").
+        version: id de la VersionHorario donde se guardó (sólo generar_horario). """
+    poblacion: list
+    puntajes: list
+    historial: list
+    generaciones: int
+    motivo: str
+    version: int = None
+
+    @property
+    def mejor(self):
+        return self.poblacion[0]
+
+    @property
+    def puntaje(self):
+        return self.puntajes[0]
+
+def puntaje_maximo(inst):
+    """ Cota superior del fitness: todas las sesiones asignadas (+10) sin penalizaciones. """
+    return 10 * inst.n_sesiones
+
+def motivo_parada(historial, inicio, objetivo=None, estancamiento=None, tiempo_max=None):
+    """ Criterio de parada cumplido con el historial hasta ahora, o None.
+        objetivo: puntaje que basta alcanzar; estancamiento: generaciones seguidas
+        sin mejorar el mejor; tiempo_max: segundos de pared desde inicio. """
+    if objetivo is not None and historial and historial[-1] >= objetivo:
+        return "objetivo"
+    if estancamiento is not None and len(historial) > estancamiento:
+        if max(historial[-estancamiento - 1:]) <= historial[-estancamiento - 1]:
+            return "estancamiento"
+    if tiempo_max is not None and time.monotonic() - inicio >= tiempo_max:
+        return "tiempo"
+    return None
+
+def _ordenar(poblacion, puntajes):
+    """ Población y puntajes de mejor a peor (estable: a igual puntaje, el primero). """
+    orden = sorted(range(len(poblacion)), key=puntajes.__getitem__, reverse=True)
+    return [poblacion[i] for i in orden], [puntajes[i] for i in orden]
+
+def evolucionar(inst, generaciones=60, tam=30, elite=6, cache=None, mutacion="reiniciar",
+                cruce="grupo", tasa_cruce=0.0, seleccion="torneo", procesos_inicial=1, progreso=None,
+                objetivo=None, estancamiento=None, tiempo_max=None, telemetria=None, poblacion=None,
+                constructor="plan"):
+    """ Corre el AG en memoria, sin tocar la BD, y devuelve un ResultadoAG.
+        Con probabilidad tasa_cruce un hijo nace de cruzar dos padres elegidos por
+        seleccion (se liberan sus choques y se repara); si no, muta una élite.
+        Se detiene antes de `generaciones` si se alcanza `objetivo` (por defecto
+        puntaje_maximo(inst)), si pasan `estancamiento` generaciones sin mejora o si
+        se agotan `tiempo_max` segundos. poblacion: inicial (None = aleatoria, armada
+        con `constructor`, ver generar_individuo()). """
+    if objetivo is None:
+        objetivo = puntaje_maximo(inst)
+    return evolucionar_poblacion(
+        inst, poblacion, generaciones, tam, elite, cache, mutacion=mutacion, cruce=cruce,
+        tasa_cruce=tasa_cruce, seleccion=seleccion, procesos_inicial=procesos_inicial,
+        progreso=progreso, objetivo=objetivo, estancamiento=estancamiento, tiempo_max=tiempo_max,
+        telemetria=telemetria, constructor=constructor)
+
+def evolucionar_poblacion(inst, poblacion=None, generaciones=60, tam=30, elite=6, cache=None,
+                          mutacion="reiniciar", cruce="grupo", tasa_cruce=0.0, seleccion="torneo",
+                          procesos_inicial=1, progreso=None,
+                          objetivo=None, estancamiento=None, tiempo_max=None, telemetria=None,
+                          constructor="plan"):
+    """ Igual que evolucionar() pero parte de una población dada (None = aleatoria,
+        construida con procesos_inicial procesos); permite continuar una corrida por
+        tramos (islas). Sin objetivo por defecto: sólo para si se pide.
+        progreso(generacion, generaciones, mejor_puntaje) se llama al inicio de cada
+        generación y al terminar; si lanza una excepción la corrida se aborta.
+        telemetria: Telemetria que recibe un registro por generación (fitness,
+        evaluaciones, cache y tiempo por fase). """
+    if cache is None:
+        cache = CacheFitness()
+    if telemetria is None:
+        telemetria = Telemetria()
+    inicio = time.monotonic()
+
+    def evaluar(poblacion):
+        with telemetria.fase("evaluacion"):
+            puntajes = evaluar_poblacion(poblacion, inst, cache)
+        with telemetria.fase("orden"):
+            return _ordenar(poblacion, puntajes)
+
+    def registrar(generacion, puntajes, antes, hijos=0):
+        # evaluaciones = cromosomas evaluados completos (fallos de cache) + hijos
+        # evaluados incrementalmente al mutarlos
+        aciertos, fallos = cache.aciertos - antes[0], cache.fallos - antes[1]
+        telemetria.generacion(generacion, puntajes, fallos + hijos, aciertos, fallos)
+
+    historial = []
+    motivo = "generaciones"
+    hechas = 0
+    if poblacion is None:
+        with telemetria.fase("inicializacion"):
+            poblacion = poblacion_inicial(inst, tam, procesos=procesos_inicial, constructor=constructor)
+    for generacion in range(generaciones):
+        antes = (cache.aciertos, cache.fallos)
+        poblacion, puntajes = evaluar(poblacion)
+        historial.append(puntajes[0])
+        if progreso:
+            progreso(generacion, generaciones, puntajes[0])
+        parada = motivo_parada(historial, inicio, objetivo, estancamiento, tiempo_max)
+        if parada:
+            registrar(generacion, puntajes, antes)
+            motivo = parada
+            break
+        with telemetria.fase("reproduccion"):
+            nueva = _reproducir(inst, poblacion, puntajes, tam, elite, cache,
+                                mutacion, cruce, tasa_cruce, seleccion)
+        registrar(generacion, puntajes, antes, len(nueva) - min(elite, len(poblacion)))
         poblacion = nueva
+        hechas += 1
+
+    if motivo == "generaciones":
+        antes = (cache.aciertos, cache.fallos)
+        poblacion, puntajes = evaluar(poblacion)
+        historial.append(puntajes[0])
+        registrar(hechas, puntajes, antes)
+    if progreso:
+        progreso(hechas, hechas, puntajes[0])
+    return ResultadoAG(poblacion, puntajes, historial, hechas, motivo)
+
+def _reproducir(inst, poblacion, puntajes, tam, elite, cache, mutacion, cruce, tasa_cruce, seleccion):
+    """ Siguiente generación: la élite pasa intacta y el resto son hijos por cruce
+        (probabilidad tasa_cruce) o mutación de una élite. Los puntajes de los hijos,
+        calculados de forma incremental, quedan en la cache. """
+    nueva = poblacion[:elite]
+    evaluadores = {}                # un evaluador incremental por élite, creado al usarse
+    while len(nueva) < tam:
+        if tasa_cruce and random.random() < tasa_cruce:
+            a = poblacion[seleccionar(puntajes, seleccion)]
+            b = poblacion[seleccionar(puntajes, seleccion)]
+            hijo = cruzar(a, b, cruce)
+            ev = EvaluadorIncremental(hijo, inst)
+            liberar_choques(hijo, ev)
+            hijo = mutar(hijo, p=0.20, evaluador=ev, modo=mutacion, inst=inst)
+            cache.guardar(cache.clave(hijo), ev.puntaje)
+            nueva.append(hijo)
+            continue
+        k = random.randrange(min(elite, len(poblacion)))
+        padre = poblacion[k]
+        if k not in evaluadores:
+            evaluadores[k] = EvaluadorIncremental(padre, inst)
+        ev = evaluadores[k]
+        hijo = mutar(padre, p=0.20, evaluador=ev, modo=mutacion, inst=inst)
+        cache.guardar(cache.clave(hijo), ev.puntaje)  # la próxima generación no lo reevalúa
+        ev.deshacer()
+        nueva.append(hijo)
+    return nueva
+
+def generaciones_hasta(historial, objetivo):
+    """ Primera generación cuyo mejor puntaje alcanza objetivo, o None. """
+    for k, puntaje in enumerate(historial):
+        if puntaje >= objetivo:
+            return k
+    return None
+
+def guardar_horario(resultado, publicar=True):
+    """ Guarda el mejor individuo como una versión nueva del horario y, si se pide,
+        la publica; el horario visible no queda vacío ni a medias mientras tanto. """
+    from app import versiones
+    version_id = versiones.crear_version(resultado.mejor, resultado.puntaje,
+                                         resultado.generaciones, resultado.motivo)
+    if publicar:
+        versiones.publicar(version_id)
+    resultado.version = version_id
+    return version_id
+
+def generar_horario(generaciones=60, tam=30, elite=6, cache=None, mutacion="reiniciar",
+                    cruce="grupo", tasa_cruce=0.0, seleccion="torneo",
+                    islas=1, intervalo_migracion=10, migrantes=2, semilla=None, procesos_inicial=1,
+                    progreso=None, objetivo=None, estancamiento=None, tiempo_max=None,
+                    telemetria=None, publicar=True, partir_de_publicado=False, fraccion_publicado=0.5,
+                    descomponer=False, procesos_descomposicion=None, constructor="plan"):
+    """ Corre el AG, guarda el mejor horario como una versión nueva (publicada si
+        publicar) y devuelve el ResultadoAG (con el motivo de parada, las
+        generaciones usadas y el id de la versión).
+        cache: CacheFitness a usar (p.ej. para leer aciertos/fallos al terminar);
+        si no se pasa se crea una con el tamaño por defecto.
+        mutacion: "reiniciar" (comportamiento original) o "reparar".
+        cruce / tasa_cruce / seleccion: ver evolucionar(); tasa 0 = sólo mutación.
+        islas > 1: modelo de islas en procesos (ver islas.evolucionar_islas); cada
+        proceso usa su propia cache. semilla: repite una corrida.
+        procesos_inicial: procesos para construir la población inicial (corrida serial).
+        constructor: "plan" o "restringido" (primero las sesiones más restringidas),
+        cómo se arman los individuos aleatorios de la población inicial.
+        progreso: callback por generación (ver evolucionar_poblacion); si lanza una
+        excepción no se guarda nada.
+        objetivo / estancamiento / tiempo_max: criterios de parada (ver evolucionar()).
+        telemetria: Telemetria de la corrida (p.ej. con perfil=True o memoria=True);
+        haya terminado bien o no, queda publicada como la última (/api/ag/metricas);
+        su resumen incluye las sesiones sin ubicación factible (sin_dominio).
+        partir_de_publicado: si hay un horario publicado, fraccion_publicado de la
+        población inicial sale de él (ver individuo_desde_horario y poblacion_desde).
+        descomponer: resuelve por separado (en procesos_descomposicion procesos) cada
+        subproblema independiente (ver descomposicion.evolucionar_descompuesto); no
+        se combina con islas. """
+    from app import versiones
+    if telemetria is None:
+        telemetria = Telemetria()
+    resultado = None
+    telemetria.iniciar()
+    try:
+        with telemetria.fase("carga"):
+            inst = cargar_instancia()  # única lectura del catálogo; el AG corre en memoria
+        with telemetria.fase("dominios"):
+            telemetria.resumen["sin_dominio"] = [dict(grupo_id=g, materia_id=m) for g, m in sin_dominio(inst)]
+        if semilla is not None:
+            random.seed(semilla)
+        poblacion = None
+        activa = versiones.version_activa() if partir_de_publicado else None
+        if activa is not None:
+            with telemetria.fase("inicializacion"):
+                base = individuo_desde_horario(inst, versiones.sesiones(activa))
+                poblacion = poblacion_desde(inst, base, tam, fraccion_publicado,
+                                            procesos=procesos_inicial, constructor=constructor)
+        resultado = resolver(inst, generaciones, tam, elite, cache, islas, intervalo_migracion,
+                             migrantes, semilla, procesos_inicial, descomponer, procesos_descomposicion,
+                             mutacion=mutacion, cruce=cruce, tasa_cruce=tasa_cruce, seleccion=seleccion,
+                             progreso=progreso, objetivo=objetivo, estancamiento=estancamiento,
+                             tiempo_max=tiempo_max, telemetria=telemetria, poblacion=poblacion,
+                             constructor=constructor)
+        with telemetria.fase("persistencia"):
+            guardar_horario(resultado, publicar)
+    finally:
+        telemetria.terminar(resultado)
+        publicar_telemetria(telemetria)
+    return resultado
+
+def resolver(inst, generaciones=60, tam=30, elite=6, cache=None, islas=1, intervalo_migracion=10,
+             migrantes=2, semilla=None, procesos_inicial=1, descomponer=False,
+             procesos_descomposicion=None, **opciones):
+    """ Corre el AG sobre una Instancia ya cargada, sin BD: islas si islas > 1, por
+        subproblemas si descomponer y si no evolucionar(). semilla sólo deriva las
+        de islas y subproblemas; el random global lo siembra quien llama.
+        opciones: las de evolucionar() (mutacion, cruce, objetivo, telemetria,
+        poblacion, constructor...). Devuelve el ResultadoAG. """
+    if islas > 1:
+        from app.islas import evolucionar_islas
+        return evolucionar_islas(inst, islas, generaciones, tam, elite,
+                                 intervalo_migracion, migrantes, semilla, **opciones)
+    if descomponer:
+        from app.descomposicion import evolucionar_descompuesto
+        return evolucionar_descompuesto(inst, generaciones, tam, elite, semilla,
+                                        procesos_descomposicion, **opciones)
+    return evolucionar(inst, generaciones, tam, elite, cache, procesos_inicial=procesos_inicial, **opciones)
+
 
-    mejor = max(poblacion, key=fitness)
-
-    Horario.query.delete()
-    db.session.commit()
-    for (g, m, d, dia, turno, ini, fin) in mejor:
-        if d and dia:
-            db.session.add(Horario(
-                grupo_id=g, materia_id=m, docente_id=d,
-                dia=dia, turno=turno, bloque_inicio=ini, bloque_fin=fin
-            ))
-    db.session.commit()
-    return mejor, fitness(mejor)
+if __name__ == "__main__":
+    from app.solver import main
+    main()
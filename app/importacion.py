@@ -0,0 +1,310 @@
+import csv
+import io
+import json
+import os
+import time
+from sqlalchemy.exc import IntegrityError
+from app import db, cache_horario
+from app.models import (
+    Grupo, Materia, Docente, DocenteMateria, Disponibilidad, ReservaModulo, MateriaGrupo,
+    Turno, DIAS
+)
+from app.ocupacion import BLOQUES_POR_TURNO
+
+# Alta masiva del catálogo. Cada sección es una lista de filas (dicts) y las
+# referencias van por nombre, como las escribiría una persona:
+#   grupos:         nombre, turno
+#   materias:       nombre, turno, bloques_duracion (2 si falta)
+#   docentes:       nombre, correo, materias ("A;B" en CSV, lista en JSON): se habilita
+#                   cada materia con ese nombre en todos los turnos (como seed.py)
+#   plan:           grupo, materia, sesiones_semana (la materia del turno del grupo)
+#   disponibilidad: docente (nombre o correo), dia, turno, bloque_inicio, bloque_fin
+#   reservas:       grupo, materia, dia, turno, bloque_inicio, bloque_fin
+# Las secciones se cargan en este orden, así que una fila puede referirse a algo
+# dado de alta más arriba en la misma importación.
+SECCIONES = ("grupos", "materias", "docentes", "plan", "disponibilidad", "reservas")
+LOTE = 1000        # filas por executemany
+MAX_ERRORES = 200  # errores de fila que se listan en el reporte (se cuentan todos)
+
+
+class ErrorFila(ValueError):
+    pass
+
+
+# -------------------- Lectura de archivos --------------------
+def leer_csv(texto):
+    """ Filas de un CSV con encabezado (nombres de columna en minúsculas). """
+    lector = csv.DictReader(io.StringIO(texto.lstrip("\ufeff")))
+    return [{(k or "").strip().lower(): v for k, v in fila.items()} for fila in lector]
+
+
+def leer_archivo(texto, nombre, seccion=None):
+    """ dict sección -> filas. Un .json trae varias secciones ({"grupos": [...], ...});
+        un CSV es una sola: `seccion` o, si falta, el nombre del archivo (grupos.csv). """
+    if nombre.lower().endswith(".json"):
+        datos = json.loads(texto)
+        if not isinstance(datos, dict):
+            raise ValueError(f"{nombre}: se esperaba un objeto con secciones {SECCIONES}")
+        return datos
+    seccion = seccion or os.path.splitext(os.path.basename(nombre))[0].lower()
+    return {seccion: leer_csv(texto)}
+
+
+# -------------------- Validación de filas --------------------
+def _texto(fila, campo, obligatorio=True):
+    valor = fila.get(campo)
+    valor = "" if valor is None else str(valor).strip()
+    if obligatorio and not valor:
+        raise ErrorFila(f"falta {campo}")
+    return valor
+
+
+def _entero(fila, campo, defecto=None, minimo=1, maximo=None):
+    valor = _texto(fila, campo, obligatorio=defecto is None)
+    if not valor:
+        return defecto
+    try:
+        n = int(valor)
+    except ValueError:
+        raise ErrorFila(f"{campo} no es un entero: {valor!r}")
+    if n < minimo or (maximo is not None and n > maximo):
+        raise ErrorFila(f"{campo} fuera de rango: {n}")
+    return n
+
+
+def _turno(fila):
+    valor = _texto(fila, "turno").upper()
+    try:
+        return Turno(valor)
+    except ValueError:
+        raise ErrorFila(f"turno inválido: {valor!r}")
+
+
+def _dia(fila):
+    valor = _texto(fila, "dia").upper()
+    if valor not in DIAS:
+        raise ErrorFila(f"día inválido: {valor!r}")
+    return valor
+
+
+def _tramo(fila):
+    ini = _entero(fila, "bloque_inicio", maximo=BLOQUES_POR_TURNO)
+    fin = _entero(fila, "bloque_fin", maximo=BLOQUES_POR_TURNO)
+    if fin < ini:
+        raise ErrorFila(f"bloque_fin {fin} antes de bloque_inicio {ini}")
+    return ini, fin
+
+
+class _Nombres:
+    """ Índices nombre -> id de lo que ya está en la BD (incluido lo importado en esta
+        transacción); cada recarga es una consulta por tabla, nunca una por fila. """
+
+    def __init__(self):
+        self.cargar_grupos()
+        self.cargar_materias()
+        self.cargar_docentes()
+        self.plan = set(db.session.query(MateriaGrupo.grupo_id, MateriaGrupo.materia_id))
+
+    def cargar_grupos(self):
+        self.grupos = {nombre: (gid, turno) for gid, nombre, turno in
+                       db.session.query(Grupo.id, Grupo.nombre, Grupo.turno)}
+
+    def cargar_materias(self):
+        self.materias = {}
+        for mid, nombre, turno in db.session.query(Materia.id, Materia.nombre, Materia.turno):
+            self.materias.setdefault(nombre, {})[turno] = mid
+
+    def cargar_docentes(self):
+        self.docentes = {}
+        self.correos = {}
+        for did, nombre, correo in db.session.query(Docente.id, Docente.nombre, Docente.correo):
+            self.docentes.setdefault(nombre, []).append(did)
+            if correo:
+                self.correos.setdefault(correo.lower(), []).append(did)
+
+    def grupo(self, nombre):
+        if nombre not in self.grupos:
+            raise ErrorFila(f"no existe el grupo {nombre!r}")
+        return self.grupos[nombre]
+
+    def materia(self, nombre, turno):
+        mid = self.materias.get(nombre, {}).get(turno)
+        if mid is None:
+            raise ErrorFila(f"no existe la materia {nombre!r} en el turno {turno.value}")
+        return mid
+
+    def docente(self, ref):
+        ids = self.docentes.get(ref) or self.correos.get(ref.lower())
+        if not ids:
+            raise ErrorFila(f"no existe el docente {ref!r}")
+        if len(ids) > 1:
+            raise ErrorFila(f"hay {len(ids)} docentes {ref!r}; usar el correo")
+        return ids[0]
+
+
+def _materias_docente(fila, nombres):
+    valor = fila.get("materias") or []
+    if isinstance(valor, str):
+        valor = valor.split(";")
+    ids = []
+    for nombre in (str(v).strip() for v in valor):
+        if not nombre:
+            continue
+        por_turno = nombres.materias.get(nombre)
+        if not por_turno:
+            raise ErrorFila(f"no existe la materia {nombre!r}")
+        ids.extend(por_turno.values())
+    return ids
+
+
+# Cada sección: (fila, nombres, vistos en la importación) -> dict a insertar
+def _grupo(fila, nombres, vistos):
+    nombre, turno = _texto(fila, "nombre"), _turno(fila)
+    if nombre in nombres.grupos or nombre in vistos:
+        raise ErrorFila(f"ya existe el grupo {nombre!r}")
+    vistos.add(nombre)
+    return dict(nombre=nombre, turno=turno)
+
+
+def _materia(fila, nombres, vistos):
+    nombre, turno = _texto(fila, "nombre"), _turno(fila)
+    duracion = _entero(fila, "bloques_duracion", defecto=2, maximo=BLOQUES_POR_TURNO)
+    if turno in nombres.materias.get(nombre, {}) or (nombre, turno) in vistos:
+        raise ErrorFila(f"ya existe la materia {nombre!r} en el turno {turno.value}")
+    vistos.add((nombre, turno))
+    return dict(nombre=nombre, turno=turno, bloques_duracion=duracion)
+
+
+def _docente(fila, nombres, vistos):
+    nombre = _texto(fila, "nombre")
+    materias = _materias_docente(fila, nombres)
+    if nombre in nombres.docentes or nombre in vistos:
+        raise ErrorFila(f"ya existe el docente {nombre!r}")
+    vistos.add(nombre)
+    return dict(nombre=nombre, correo=_texto(fila, "correo", obligatorio=False), materias=materias)
+
+
+def _plan(fila, nombres, vistos):
+    gid, turno = nombres.grupo(_texto(fila, "grupo"))
+    mid = nombres.materia(_texto(fila, "materia"), turno)
+    sesiones = _entero(fila, "sesiones_semana")
+    if (gid, mid) in nombres.plan or (gid, mid) in vistos:
+        raise ErrorFila("la materia ya está en el plan del grupo")
+    vistos.add((gid, mid))
+    return dict(grupo_id=gid, materia_id=mid, sesiones_semana=sesiones)
+
+
+def _disponibilidad(fila, nombres, vistos):
+    did = nombres.docente(_texto(fila, "docente"))
+    ini, fin = _tramo(fila)
+    return dict(docente_id=did, dia=_dia(fila), turno=_turno(fila), bloque_inicio=ini, bloque_fin=fin)
+
+
+def _reserva(fila, nombres, vistos):
+    gid, _ = nombres.grupo(_texto(fila, "grupo"))
+    turno = _turno(fila)
+    mid = nombres.materia(_texto(fila, "materia"), turno)
+    ini, fin = _tramo(fila)
+    return dict(grupo_id=gid, materia_id=mid, dia=_dia(fila), turno=turno, bloque_inicio=ini, bloque_fin=fin)
+
+
+_VALIDAR = {
+    "grupos": (_grupo, Grupo),
+    "materias": (_materia, Materia),
+    "docentes": (_docente, Docente),
+    "plan": (_plan, MateriaGrupo),
+    "disponibilidad": (_disponibilidad, Disponibilidad),
+    "reservas": (_reserva, ReservaModulo),
+}
+
+
+# -------------------- Importación --------------------
+def _insertar(modelo, filas):
+    """ INSERT con executemany, de a LOTE filas. """
+    for i in range(0, len(filas), LOTE):
+        db.session.execute(modelo.__table__.insert(), filas[i:i + LOTE])
+
+
+def importar_catalogo(secciones, parcial=False):
+    """ Valida e inserta las secciones (dict sección -> lista de filas) en una sola
+        transacción. Si alguna fila tiene errores no se guarda nada, salvo con
+        parcial=True, que guarda las válidas. Devuelve el reporte: filas leídas, válidas
+        y tiempo por sección, total insertado, filas/s y los errores (sección, fila,
+        error), con la fila contada desde 1 sin el encabezado. """
+    desconocidas = set(secciones) - set(SECCIONES)
+    if desconocidas:
+        raise ValueError(f"Secciones desconocidas: {sorted(desconocidas)} (válidas: {SECCIONES})")
+
+    inicio = time.perf_counter()
+    errores = []
+    total_errores = 0
+    reporte = {}
+    try:
+        nombres = _Nombres()
+        for seccion in SECCIONES:
+            filas = secciones.get(seccion) or []
+            if not isinstance(filas, list):
+                raise ValueError(f"La sección {seccion} debe ser una lista de filas")
+            t = time.perf_counter()
+            validar, modelo = _VALIDAR[seccion]
+            nuevas = []
+            vistos = set()
+            for n, fila in enumerate(filas, start=1):
+                try:
+                    if not isinstance(fila, dict):
+                        raise ErrorFila("la fila no es un objeto")
+                    nuevas.append(validar(fila, nombres, vistos))
+                except ErrorFila as e:
+                    total_errores += 1
+                    if len(errores) < MAX_ERRORES:
+                        errores.append({"seccion": seccion, "fila": n, "error": str(e)})
+
+            if seccion == "docentes":
+                materias = [fila.pop("materias") for fila in nuevas]
+                _insertar(modelo, nuevas)
+                nombres.cargar_docentes()
+                habilitaciones = [dict(docente_id=nombres.docentes[fila["nombre"]][0], materia_id=mid)
+                                  for fila, mids in zip(nuevas, materias) for mid in mids]
+                _insertar(DocenteMateria, habilitaciones)
+            else:
+                _insertar(modelo, nuevas)
+            if seccion == "grupos":
+                nombres.cargar_grupos()
+            elif seccion == "materias":
+                nombres.cargar_materias()
+            elif seccion == "plan":
+                nombres.plan |= vistos
+
+            if filas:
+                reporte[seccion] = {"filas": len(filas), "validas": len(nuevas),
+                                    "errores": len(filas) - len(nuevas),
+                                    "segundos": round(time.perf_counter() - t, 4)}
+                if seccion == "docentes":
+                    reporte[seccion]["habilitaciones"] = len(habilitaciones)
+
+        confirmado = parcial or total_errores == 0
+        if confirmado:
+            db.session.commit()
+            cache_horario.invalidar()  # los INSERT masivos no pasan por vigilar_catalogo
+        else:
+            db.session.rollback()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise ValueError(f"La BD rechazó la importación: {e.orig}")
+    except Exception:
+        db.session.rollback()
+        raise
+
+    segundos = time.perf_counter() - inicio
+    leidas = sum(s["filas"] for s in reporte.values())
+    insertadas = sum(s["validas"] for s in reporte.values()) if confirmado else 0
+    return {
+        "confirmado": confirmado,
+        "filas": leidas,
+        "insertadas": insertadas,
+        "total_errores": total_errores,
+        "errores": errores,
+        "secciones": reporte,
+        "segundos": round(segundos, 4),
+        "filas_por_segundo": round(leidas / segundos, 1) if segundos else None,
+    }
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from app.constantes import Turno
+from app.ocupacion import mascara
+
+
+# -------------------- Instantánea del problema --------------------
+@dataclass(frozen=True, eq=False)
+class Instancia:
+    """ Copia inmutable del catálogo, cargada una sola vez antes de correr el AG.
+
+        grupos, materias, docentes: tuplas de ids; su posición es el índice denso
+        idx_grupo, idx_materia, idx_docente: dict[id] = índice
+        sesiones: tupla de (grupo_id, materia_id, turno), una por sesión semanal
+        duracion: dict[materia_id] = bloques_duracion
+        docentes_por_materia: dict[materia_id] = tupla de docente_id
+        disponibilidad: dict[docente_id] = máscara de bits de los slots disponibles
+        reservas_mascara: dict[grupo_id] = máscara de bits de los slots reservados
+        reservas_rangos: dict[(grupo_id, materia_id, dia)] = (ini, fin) """
+    grupos: tuple
+    materias: tuple
+    docentes: tuple
+    idx_grupo: dict
+    idx_materia: dict
+    idx_docente: dict
+    sesiones: tuple
+    duracion: dict
+    docentes_por_materia: dict
+    disponibilidad: dict
+    reservas_mascara: dict
+    reservas_rangos: dict
+
+    @property
+    def n_sesiones(self):
+        return len(self.sesiones)
+
+
+def cargar_instancia():
+    """ Lee el catálogo completo con una consulta por tabla y arma la Instancia. """
+    return armar_instancia(**leer_catalogo())
+
+
+def leer_catalogo():
+    """ Filas del catálogo que usa el AG, como dict de listas (ver armar_instancia()).
+        Es también el contenido de un archivo de instancia (ver app.solver). """
+    from app import db
+    from app.models import (
+        Grupo, Materia, Docente, DocenteMateria, Disponibilidad, ReservaModulo, MateriaGrupo
+    )
+
+    return dict(
+        grupos=[gid for (gid,) in db.session.query(Grupo.id).order_by(Grupo.id)],
+        docentes=[did for (did,) in db.session.query(Docente.id).order_by(Docente.id)],
+        materias=[tuple(fila) for fila in db.session.query(
+            Materia.id, Materia.turno, Materia.bloques_duracion).order_by(Materia.id)],
+        materia_grupo=[tuple(fila) for fila in db.session.query(
+            MateriaGrupo.grupo_id, MateriaGrupo.materia_id, MateriaGrupo.sesiones_semana)
+            .order_by(MateriaGrupo.id)],
+        docente_materia=[tuple(fila) for fila in db.session.query(
+            DocenteMateria.docente_id, DocenteMateria.materia_id).order_by(DocenteMateria.id)],
+        disponibilidad=[tuple(fila) for fila in db.session.query(
+            Disponibilidad.docente_id, Disponibilidad.dia, Disponibilidad.turno,
+            Disponibilidad.bloque_inicio, Disponibilidad.bloque_fin)],
+        reservas=[tuple(fila) for fila in db.session.query(
+            ReservaModulo.grupo_id, ReservaModulo.materia_id, ReservaModulo.dia,
+            ReservaModulo.turno, ReservaModulo.bloque_inicio, ReservaModulo.bloque_fin)
+            .order_by(ReservaModulo.id)],
+    )
+
+
+def armar_instancia(grupos, docentes, materias, materia_grupo, docente_materia, disponibilidad, reservas):
+    """ Instancia a partir de las filas del catálogo, sin BD:
+        grupos, docentes: ids; materias: (id, turno, bloques_duracion);
+        materia_grupo: (grupo_id, materia_id, sesiones_semana) en orden de id;
+        docente_materia: (docente_id, materia_id); disponibilidad: (docente_id, dia,
+        turno, ini, fin); reservas: (grupo_id, materia_id, dia, turno, ini, fin).
+        El turno puede venir como Turno o como su valor ("MATUTINO"). """
+    grupos = tuple(grupos)
+    docentes = tuple(docentes)
+
+    turno_materia = {}
+    duracion = {}
+    for mid, turno, dur in materias:
+        turno_materia[mid] = Turno(turno)
+        duracion[mid] = dur
+    materias = tuple(mid for mid, turno, dur in materias)
+
+    sesiones = []
+    for gid, mid, n in materia_grupo:
+        for _ in range(n):
+            sesiones.append((gid, mid, turno_materia[mid]))
+
+    docentes_por_materia = {mid: [] for mid in materias}
+    for did, mid in docente_materia:
+        docentes_por_materia.setdefault(mid, []).append(did)
+
+    disponibilidad_mascara = {did: 0 for did in docentes}
+    for did, dia, turno, ini, fin in disponibilidad:
+        disponibilidad_mascara[did] = disponibilidad_mascara.get(did, 0) | mascara(dia, Turno(turno), ini, fin)
+
+    reservas_mascara = {gid: 0 for gid in grupos}
+    reservas_rangos = {}
+    for gid, mid, dia, turno, ini, fin in reservas:
+        reservas_mascara[gid] = reservas_mascara.get(gid, 0) | mascara(dia, Turno(turno), ini, fin)
+        reservas_rangos[(gid, mid, dia)] = (ini, fin)
+
+    return Instancia(
+        grupos=grupos,
+        materias=materias,
+        docentes=docentes,
+        idx_grupo={gid: i for i, gid in enumerate(grupos)},
+        idx_materia={mid: i for i, mid in enumerate(materias)},
+        idx_docente={did: i for i, did in enumerate(docentes)},
+        sesiones=tuple(sesiones),
+        duracion=duracion,
+        docentes_por_materia={mid: tuple(ds) for mid, ds in docentes_por_materia.items()},
+        disponibilidad=disponibilidad_mascara,
+        reservas_mascara=reservas_mascara,
+        reservas_rangos=reservas_rangos,
+    )
@@ -0,0 +1,96 @@
+import os
+import random
+import time
+from app import paralelo
+from app.cromosoma import compactar_poblacion, expandir_poblacion
+from app.genetico import evolucionar_poblacion, motivo_parada, puntaje_maximo, ResultadoAG
+from app.telemetria import Telemetria
+
+
+def _epoca(poblacion, generaciones, semilla, opciones):
+    # las poblaciones entran y salen compactas (ver app.cromosoma)
+    random.seed(semilla)
+    if poblacion is not None:
+        poblacion = expandir_poblacion(poblacion, paralelo._inst)
+    r = evolucionar_poblacion(paralelo._inst, poblacion, generaciones, cache=paralelo._cache, **opciones)
+    r.poblacion = compactar_poblacion(r.poblacion, paralelo._inst)
+    return r
+
+
+def evolucionar_islas(inst, islas=4, generaciones=60, tam=30, elite=6, intervalo=10,
+                      migrantes=2, semilla=None, procesos=None, progreso=None,
+                      objetivo=None, estancamiento=None, tiempo_max=None, telemetria=None,
+                      poblacion=None, **opciones):
+    """ Modelo de islas: `islas` poblaciones independientes, cada una en un proceso.
+        Cada `intervalo` generaciones los `migrantes` mejores de la isla i reemplazan
+        a los peores de la isla i+1 (anillo). La semilla de cada isla y época se
+        deriva de `semilla`, así que una misma semilla repite la corrida.
+        opciones: mutacion, cruce, tasa_cruce, seleccion (ver evolucionar()).
+        objetivo y tiempo_max también cortan una época en curso; el estancamiento se
+        mide sobre el mejor global al cerrar cada época.
+        progreso(generacion, generaciones, mejor) se llama al final de cada época.
+        poblacion: inicial de todas las islas (None = aleatoria en cada una).
+        telemetria recibe un registro por época (puntajes de todas las islas, tiempo
+        en la fase "islas"); las evaluaciones ocurren en los procesos y no se cuentan.
+        Devuelve un ResultadoAG con la población de la mejor isla. """
+    if semilla is None:
+        semilla = random.randrange(2 ** 32)
+    if procesos is None:
+        procesos = min(islas, os.cpu_count() or 1)
+    if objetivo is None:
+        objetivo = puntaje_maximo(inst)
+    if telemetria is None:
+        telemetria = Telemetria()
+    opciones = dict(opciones, tam=tam, elite=elite, objetivo=objetivo)
+    if poblacion is not None:
+        poblacion = compactar_poblacion(poblacion, inst)
+    inicio = time.monotonic()
+
+    resultados = [None] * islas
+    historial = []
+    motivo = None
+    with paralelo.pool(inst, procesos) as pool:
+        hechas, epoca = 0, 0
+        while True:
+            n = min(intervalo, generaciones - hechas)
+            if tiempo_max is not None:
+                opciones["tiempo_max"] = max(tiempo_max - (time.monotonic() - inicio), 0)
+            with telemetria.fase("islas"):
+                futuros = [pool.submit(_epoca, r.poblacion if r else poblacion, n, f"{semilla}:{i}:{epoca}", opciones)
+                           for i, r in enumerate(resultados)]
+                resultados = [f.result() for f in futuros]
+            # mejor global por generación (una isla que paró antes repite su último valor);
+            # el último valor de cada época es el inicio de la siguiente
+            corridas = max(r.generaciones for r in resultados)
+            historial.extend(max(r.historial[min(k, len(r.historial) - 1)] for r in resultados)
+                             for k in range(corridas))
+            hechas += corridas
+            epoca += 1
+            mejor = max(r.puntaje for r in resultados)
+            telemetria.generacion(hechas, [p for r in resultados for p in r.puntajes], evaluaciones=None)
+            if progreso:
+                progreso(hechas, generaciones, mejor)
+            motivo = motivo_parada(historial + [mejor], inicio, objetivo, estancamiento, tiempo_max)
+            if motivo is None and hechas >= generaciones:
+                motivo = "generaciones"
+            if motivo:
+                historial.append(mejor)
+                break
+            _migrar([r.poblacion for r in resultados], [r.puntajes for r in resultados], migrantes)
+
+    i = max(range(islas), key=lambda k: resultados[k].puntaje)
+    r = resultados[i]
+    return ResultadoAG(expandir_poblacion(r.poblacion, inst), r.puntajes, historial, hechas, motivo)
+
+
+def _migrar(poblaciones, puntajes, migrantes):
+    """ Anillo: los mejores de cada isla (poblaciones ya ordenadas) sustituyen a los
+        peores de la siguiente. Las copias salen antes de modificar ninguna isla. """
+    if migrantes <= 0 or len(poblaciones) < 2:
+        return
+    emigran = [(pob[:migrantes], pts[:migrantes]) for pob, pts in zip(poblaciones, puntajes)]
+    for i, (inds, pts) in enumerate(emigran):
+        destino = (i + 1) % len(poblaciones)
+        k = min(migrantes, len(poblaciones[destino]))
+        poblaciones[destino][-k:] = inds[:k]
+        puntajes[destino][-k:] = pts[:k]
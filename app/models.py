@@ -1,11 +1,6 @@
-from enum import Enum
+from datetime import datetime
 from app import db
-
-class Turno(str, Enum):
-    MATUTINO = "MATUTINO"     # 07:00–13:40 (bloques 1..8)
-    VESPERTINO = "VESPERTINO" # 14:00–20:40 (bloques 1..8)
-
-DIAS = ["LUNES", "MARTES", "MIERCOLES", "JUEVES", "VIERNES"]
+from app.constantes import Turno, DIAS
 
 # ---------- Catálogos ----------
 class Grupo(db.Model):
@@ -36,7 +31,7 @@ class DocenteMateria(db.Model):
     __tablename__ = "docente_materia"
     id = db.Column(db.Integer, primary_key=True)
     docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
-    materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
+    materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False, index=True)
     docente = db.relationship("Docente", back_populates="materias")
     materia = db.relationship("Materia", back_populates="docentes")
 
@@ -44,7 +39,7 @@ class DocenteMateria(db.Model):
 class MateriaGrupo(db.Model):
     __tablename__ = "materia_grupo"
     id = db.Column(db.Integer, primary_key=True)
-    grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
+    grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False, index=True)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
     sesiones_semana = db.Column(db.Integer, nullable=False, default=1)
 
@@ -54,7 +49,7 @@ class MateriaGrupo(db.Model):
 class Disponibilidad(db.Model):
     __tablename__ = "disponibilidad"
     id = db.Column(db.Integer, primary_key=True)
-    docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
+    docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False, index=True)
     dia = db.Column(db.String(12), nullable=False)              # LUNES..VIERNES
     turno = db.Column(db.Enum(Turno), nullable=False)
     bloque_inicio = db.Column(db.Integer, nullable=False)       # 1..8
@@ -64,6 +59,7 @@ class Disponibilidad(db.Model):
 # Reservas de módulos por grupo y materia (p.ej., Inglés / Desarrollo Humano)
 class ReservaModulo(db.Model):
     __tablename__ = "reserva_modulo"
+    __table_args__ = (db.Index("ix_reserva_modulo_grupo_materia", "grupo_id", "materia_id"),)
     id = db.Column(db.Integer, primary_key=True)
     grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
@@ -75,10 +71,30 @@ class ReservaModulo(db.Model):
     grupo = db.relationship("Grupo")
     materia = db.relationship("Materia")
 
-# Resultado final
+# Resultado final: cada corrida escribe una versión nueva; la publicada es la de HorarioActivo
+class VersionHorario(db.Model):
+    __tablename__ = "version_horario"
+    id = db.Column(db.Integer, primary_key=True)
+    creada = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    publicada = db.Column(db.DateTime)                          # última vez que se publicó
+    puntaje = db.Column(db.Integer)
+    generaciones = db.Column(db.Integer)
+    motivo = db.Column(db.String(20))                           # motivo de parada del AG
+    nota = db.Column(db.String(200))
+    horarios = db.relationship("Horario", back_populates="version", cascade="all, delete-orphan")
+
+# Puntero a la versión publicada: una sola fila (id=1); publicar = actualizarla
+class HorarioActivo(db.Model):
+    __tablename__ = "horario_activo"
+    id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, db.ForeignKey("version_horario.id"), nullable=False)
+
 class Horario(db.Model):
     __tablename__ = "horario"
+    # toda lectura filtra por versión; el tablero además por grupo y ordena por día y bloque
+    __table_args__ = (db.Index("ix_horario_version_grupo_dia", "version_id", "grupo_id", "dia", "bloque_inicio"),)
     id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, db.ForeignKey("version_horario.id"), nullable=False, index=True)
     grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
     docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
@@ -87,6 +103,7 @@ class Horario(db.Model):
     bloque_inicio = db.Column(db.Integer, nullable=False)
     bloque_fin = db.Column(db.Integer, nullable=False)
 
+    version = db.relationship("VersionHorario", back_populates="horarios")
     grupo = db.relationship("Grupo")
     materia = db.relationship("Materia")
     docente = db.relationship("Docente")
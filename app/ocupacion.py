@@ -0,0 +1,56 @@
+from functools import lru_cache
+from app.constantes import DIAS, Turno
+
+# Una semana = len(DIAS) x len(Turno) x BLOQUES_POR_TURNO = 80 slots, un bit por slot:
+#   bit = (idx_dia * len(Turno) + idx_turno) * BLOQUES_POR_TURNO + (b - 1)
+# La ocupación de un docente o grupo es un int; revisar un tramo ini..fin es un AND.
+BLOQUES_POR_TURNO = 8
+
+IDX_DIA = {d: i for i, d in enumerate(DIAS)}
+IDX_TURNO = {t: i for i, t in enumerate(Turno)}
+
+try:
+    contar_bits = int.bit_count
+except AttributeError:  # Python < 3.10
+    def contar_bits(x):
+        return bin(x).count("1")
+
+
+@lru_cache(maxsize=None)
+def mascara(dia, turno, ini, fin):
+    """ Bits del tramo ini..fin (bloques fuera de 1..BLOQUES_POR_TURNO se ignoran). """
+    ini, fin = max(ini, 1), min(fin, BLOQUES_POR_TURNO)
+    if fin < ini:
+        return 0
+    base = (IDX_DIA[dia] * len(IDX_TURNO) + IDX_TURNO[turno]) * BLOQUES_POR_TURNO
+    return ((1 << (fin - ini + 1)) - 1) << (base + ini - 1)
+
+
+def slots(m):
+    """ Descompone una máscara en tuplas (dia, turno, b). """
+    turnos = list(IDX_TURNO)
+    res = []
+    while m:
+        bajo = m & -m
+        bit = bajo.bit_length() - 1
+        celda, b = divmod(bit, BLOQUES_POR_TURNO)
+        dia, t = divmod(celda, len(turnos))
+        res.append((DIAS[dia], turnos[t], b + 1))
+        m ^= bajo
+    return res
+
+
+@lru_cache(maxsize=None)
+def bits(dia, turno, ini, fin):
+    """ Índices de bit del tramo ini..fin, en orden. """
+    m = mascara(dia, turno, ini, fin)
+    res = []
+    while m:
+        bajo = m & -m
+        res.append(bajo.bit_length() - 1)
+        m ^= bajo
+    return tuple(res)
+
+# Todos los slots de un día (ambos turnos): un día lleno se bloquea con un OR
+MASCARA_DIA = {dia: mascara(dia, Turno.MATUTINO, 1, BLOQUES_POR_TURNO) |
+               mascara(dia, Turno.VESPERTINO, 1, BLOQUES_POR_TURNO) for dia in DIAS}
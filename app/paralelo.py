@@ -0,0 +1,37 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from app.cache_fitness import CacheFitness
+from app.cromosoma import compactar_poblacion, expandir_poblacion
+from app.genetico import generar_individuo
+
+# Estado de cada proceso trabajador: la Instancia (sólo lectura) se envía una vez por
+# proceso en el initializer y la cache de fitness sobrevive entre tareas.
+_inst = None
+_cache = None
+
+
+def _iniciar(inst):
+    global _inst, _cache
+    _inst = inst
+    _cache = CacheFitness()
+
+
+def pool(inst, procesos):
+    """ ProcessPoolExecutor cuyos trabajadores comparten la Instancia. """
+    return ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar, initargs=(inst,))
+
+
+def _individuos(semilla, indices, constructor):
+    poblacion = [generar_individuo(_inst, random.Random(f"{semilla}:{i}"), constructor) for i in indices]
+    return compactar_poblacion(poblacion, _inst)     # vuelve al proceso principal compacta
+
+
+def poblacion_paralela(inst, tam, semilla, procesos, constructor="plan"):
+    """ Reparte los índices 0..tam-1 en bloques contiguos, uno por tarea; cada individuo
+        usa la misma semilla que en genetico.poblacion_inicial(). Los individuos
+        viajan entre procesos como cromosomas compactos (ver app.cromosoma). """
+    tamano = -(-tam // (procesos * 4))          # ~4 bloques por proceso para balancear
+    bloques = [range(i, min(i + tamano, tam)) for i in range(0, tam, tamano)]
+    with pool(inst, procesos) as ejecutor:
+        partes = ejecutor.map(_individuos, [semilla] * len(bloques), bloques, [constructor] * len(bloques))
+        return expandir_poblacion([datos for parte in partes for datos in parte], inst)
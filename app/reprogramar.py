@@ -0,0 +1,92 @@
+import random
+from collections import Counter
+from app import versiones
+from app.evaluador import sin_asignar
+from app.genetico import cargar_horario, reparar
+from app.instancia import cargar_instancia
+
+
+# -------------------- Reprogramación incremental --------------------
+def reprogramar(grupos=(), docentes=(), iteraciones=200, publicar=True, semilla=None):
+    """ Ajusta el horario publicado a un cambio puntual del catálogo sin regenerarlo.
+
+        Las sesiones que quedaron sin ubicar porque una fila guardada ya no vale
+        (descartada por genetico.cargar_horario) se reubican; luego una búsqueda local
+        optimiza sólo su vecindario: las sesiones de los grupos y docentes implicados
+        (los de esas sesiones en conflicto más `grupos` y `docentes`). Las que ya
+        estaban sin ubicar en la versión publicada (o son nuevas en el plan) se
+        reintentan una vez con reparar(), sin ampliar el vecindario: el trabajo
+        crece con el cambio, no con los huecos previos. Un movimiento libera 1-3 sesiones del vecindario, las
+        reubica con reparar() y se acepta sólo si mejora el fitness, así que el resto
+        del horario queda igual y el diff es mínimo.
+        Guarda el resultado como versión nueva (publicada si publicar) y devuelve un
+        dict con la versión, el fitness, las sesiones en conflicto, las pendientes
+        de antes y el diff (agregadas / quitadas, como versiones.comparar). """
+    if semilla is not None:
+        random.seed(semilla)
+    activa = versiones.version_activa()
+    if activa is None:
+        raise ValueError("No hay un horario publicado que reprogramar")
+    inst = cargar_instancia()
+    antes = versiones.sesiones(activa)
+    ind, ev, descartadas = cargar_horario(inst, antes)
+
+    conflictos, pendientes = _sin_ubicar(inst, ind, antes)
+    grupos = set(grupos) | {inst.sesiones[i][0] for i in conflictos}
+    docentes = set(docentes) | {fila[2] for fila in descartadas.values()}
+    vecindario = [i for i, gen in enumerate(ind) if gen[0] in grupos or gen[2] in docentes]
+
+    reparar(ind, inst, ev, conflictos + pendientes)
+    ev.confirmar()
+    for _ in range(iteraciones if vecindario else 0):
+        previo = ev.puntaje
+        for i in random.sample(vecindario, min(len(vecindario), random.randint(1, 3))):
+            g, m, d, dia, turno, ini, fin = ind[i]
+            ind[i] = (g, m, None, None, turno, None, None)
+            ev.asignar(i, ind[i])
+        reparar(ind, inst, ev, vecindario)
+        if ev.puntaje > previo:
+            ev.confirmar()
+        else:
+            ev.deshacer()
+            ind[:] = ev.genes
+
+    despues = {gen[:4] + (gen[4].value,) + gen[5:] for gen in ind if not sin_asignar(gen)}
+    diff = versiones.diferencia(antes, despues)
+    version_id = activa
+    if diff["agregadas"] or diff["quitadas"]:
+        version_id = versiones.crear_version(ind, ev.puntaje, nota="reprogramación incremental")
+        if publicar:
+            versiones.publicar(version_id)
+    return dict(diff, version=version_id, anterior=activa, puntaje=ev.puntaje,
+                conflictos=len(conflictos), pendientes=len(pendientes), vecindario=len(vecindario))
+
+
+def _sin_ubicar(inst, ind, filas):
+    """ (conflictos, pendientes): índices de las sesiones sin asignar en ind, separando
+        por (grupo, materia) las que ya no tenían fila en la versión publicada
+        (pendientes) de las que perdieron la suya por un cambio del catálogo. Una fila
+        descartada puede dejar sin ubicar a otra sesión del mismo (g, m), así que se
+        cuenta por (g, m) y no por índice. """
+    previas = Counter((g, m) for g, m, turno in inst.sesiones)
+    previas.subtract(Counter((fila[0], fila[1]) for fila in filas))
+    conflictos, pendientes = [], []
+    for i, gen in enumerate(ind):
+        if not sin_asignar(gen):
+            continue
+        if previas[gen[:2]] > 0:
+            previas[gen[:2]] -= 1
+            pendientes.append(i)
+        else:
+            conflictos.append(i)
+    return conflictos, pendientes
+
+
+def tras_eliminar_disponibilidad(docente_id, **opciones):
+    """ Reprograma después de quitar disponibilidad a un docente. """
+    return reprogramar(docentes=[docente_id], **opciones)
+
+
+def tras_nueva_reserva(grupo_id, **opciones):
+    """ Reprograma después de agregar una ReservaModulo al grupo. """
+    return reprogramar(grupos=[grupo_id], **opciones)
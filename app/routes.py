@@ -1,13 +1,32 @@
-from flask import render_template, request, redirect, url_for, flash, Blueprint, jsonify
-from app import db
+import json
+import time
+from datetime import date, timedelta
+from flask import (
+    render_template, request, redirect, url_for, flash, Blueprint, jsonify, current_app,
+    abort, Response, session, stream_with_context
+)
+from sqlalchemy.orm import selectinload
+from app import db, trabajos, telemetria, versiones, cache_horario, importacion, exportacion
 from app.models import (
     Docente, Materia, DocenteMateria, Disponibilidad, ReservaModulo, Horario,
-    Grupo, MateriaGrupo, DIAS, Turno
+    Grupo, MateriaGrupo, VersionHorario, DIAS, Turno
 )
-from app.genetico import generar_horario
+from app.cache_fitness import CacheFitness
+from app.dominios import dominios, sin_dominio
+from app.instancia import cargar_instancia
+from app.reprogramar import reprogramar, tras_eliminar_disponibilidad, tras_nueva_reserva
 
 bp = Blueprint("main", __name__)
 
+def _reprogramar_tras_edicion(reprogramar_cambio, afectado):
+    """ Con AG_REPROGRAMAR_AL_EDITAR, ajusta el horario publicado al cambio recién guardado
+        (reprogramar_cambio: una de las funciones tras_* de app.reprogramar). """
+    if not current_app.config["AG_REPROGRAMAR_AL_EDITAR"] or versiones.version_activa() is None:
+        return
+    r = reprogramar_cambio(afectado)
+    flash(f"Horario reprogramado: {r['conflictos']} sesiones en conflicto, "
+          f"{len(r['agregadas'])} agregadas y {len(r['quitadas'])} quitadas", "success")
+
 @bp.route("/")
 def index():
     return render_template("index.html")
@@ -168,7 +187,11 @@ def disponibilidad_nueva():
 
 @bp.route("/docentes")
 def listar_docentes():
-    docentes = Docente.query.order_by(Docente.nombre).all()
+    # materias y disponibilidades de todos los docentes en 2 consultas más, no 2 por fila
+    docentes = (Docente.query
+                .options(selectinload(Docente.materias).joinedload(DocenteMateria.materia),
+                         selectinload(Docente.disponibilidades))
+                .order_by(Docente.nombre).all())
     return render_template("docente_list.html", docentes=docentes)
 
 @bp.route("/docentes/<int:docente_id>/editar", methods=["GET", "POST"])
@@ -202,6 +225,7 @@ def eliminar_disponibilidad(disp_id):
     db.session.delete(disp)
     db.session.commit()
     flash("Disponibilidad eliminada", "success")
+    _reprogramar_tras_edicion(tras_eliminar_disponibilidad, docente_id)
     return redirect(url_for("main.editar_docente", docente_id=docente_id))
 
 # ---------- Reservas ----------
@@ -220,6 +244,7 @@ def reserva_nueva():
         ))
         db.session.commit()
         flash("Reserva registrada", "success")
+        _reprogramar_tras_edicion(tras_nueva_reserva, int(request.form["grupo_id"]))
         return redirect(url_for("main.reserva_nueva"))
     return render_template("reserva_form.html", grupos=grupos, materias=materias, DIAS=DIAS, Turno=Turno)
 
@@ -240,79 +265,377 @@ def eliminar_reserva(reserva_id):
     flash("Reserva eliminada", "success")
     return redirect(url_for("main.listar_reservas"))
 
+# ---------- Importación masiva del catálogo ----------
+@bp.route("/api/catalogo/importar", methods=["POST"])
+def api_importar_catalogo():
+    """ Alta masiva del catálogo (ver importacion.importar_catalogo). Acepta JSON
+        {"grupos": [...], "materias": [...], ...}, un CSV (text/csv) con ?seccion=grupos,
+        o multipart con un archivo por sección (el campo es la sección; un .json puede
+        traer varias). ?parcial=1 guarda las filas válidas aunque otras fallen.
+        200 con el reporte si se guardó, 422 si no (errores por fila), 400 si no se
+        pudo leer. """
+    parcial = request.args.get("parcial") == "1"
+    try:
+        if request.files:
+            secciones = {}
+            for campo, archivo in request.files.items(multi=True):
+                texto = archivo.read().decode("utf-8")
+                for seccion, filas in importacion.leer_archivo(texto, archivo.filename or "", campo).items():
+                    secciones.setdefault(seccion, []).extend(filas)
+        elif request.mimetype == "text/csv":
+            secciones = {request.args.get("seccion", ""): importacion.leer_csv(request.get_data(as_text=True))}
+        else:
+            secciones = request.get_json(silent=True)
+            if not isinstance(secciones, dict):
+                raise ValueError("Se esperaba JSON {sección: [filas]}, text/csv o multipart")
+        reporte = importacion.importar_catalogo(secciones, parcial=parcial)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(reporte), 200 if reporte["confirmado"] else 422
+
 # ---------- Generación / Consulta de horario ----------
+def _consulta_horario(version_id=None):
+    """ Filas (Horario, Materia, Docente, Grupo) de una versión; por defecto la publicada. """
+    return (db.session.query(Horario, Materia, Docente, Grupo)
+            .join(Materia, Horario.materia_id == Materia.id)
+            .join(Docente, Horario.docente_id == Docente.id)
+            .join(Grupo, Horario.grupo_id == Grupo.id)
+            .filter(versiones.filtro_version(version_id)))
+
+def _parametros_ag():
+    cfg = current_app.config
+    return dict(cache=CacheFitness(cfg["AG_CACHE_FITNESS"]),
+                mutacion=cfg["AG_MUTACION"],
+                cruce=cfg["AG_CRUCE"],
+                tasa_cruce=cfg["AG_TASA_CRUCE"],
+                seleccion=cfg["AG_SELECCION"],
+                islas=cfg["AG_ISLAS"],
+                intervalo_migracion=cfg["AG_INTERVALO_MIGRACION"],
+                migrantes=cfg["AG_MIGRANTES"],
+                semilla=cfg["AG_SEMILLA"],
+                procesos_inicial=cfg["AG_PROCESOS_INICIAL"],
+                constructor=cfg["AG_CONSTRUCTOR"],
+                objetivo=cfg["AG_OBJETIVO"],
+                estancamiento=cfg["AG_ESTANCAMIENTO"],
+                tiempo_max=cfg["AG_TIEMPO_MAX"],
+                partir_de_publicado=cfg["AG_PARTIR_DE_PUBLICADO"],
+                descomponer=cfg["AG_DESCOMPONER"],
+                procesos_descomposicion=cfg["AG_PROCESOS_DESCOMPOSICION"],
+                fraccion_publicado=cfg["AG_FRACCION_PUBLICADO"],
+                telemetria=telemetria.Telemetria(perfil=cfg["AG_PERFIL"], memoria=cfg["AG_MEMORIA"]))
+
 @bp.route("/generar", methods=["POST"])
 def generar():
-    mejor, puntaje = generar_horario()
-    resultado = (db.session.query(Horario, Materia, Docente, Grupo)
-                 .join(Materia, Horario.materia_id == Materia.id)
-                 .join(Docente, Horario.docente_id == Docente.id)
-                 .join(Grupo, Horario.grupo_id == Grupo.id)
-                 .all())
-    return render_template("resultado.html", resultado=resultado, puntaje=puntaje)
+    """ Encola la generación y responde de inmediato con el id del trabajo. """
+    trabajo = trabajos.enviar(current_app._get_current_object(), **_parametros_ag())
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(trabajo.a_dict()), 202
+    return redirect(url_for("main.ver_trabajo", trabajo_id=trabajo.id))
+
+def _nombres_sesiones(claves):
+    grupos = dict(db.session.query(Grupo.id, Grupo.nombre))
+    materias = dict(db.session.query(Materia.id, Materia.nombre))
+    return [(grupos.get(g, g), materias.get(m, m)) for g, m in claves]
+
+@bp.route("/api/ag/dominios")
+def api_dominios():
+    """ Tamaño del dominio factible de cada (grupo, materia) y los que quedaron vacíos. """
+    inst = cargar_instancia()
+    return jsonify({
+        "sin_dominio": [dict(grupo_id=g, materia_id=m) for g, m in sin_dominio(inst)],
+        "dominios": [dict(grupo_id=g, materia_id=m, opciones=len(dom.libres),
+                          reservas=len(dom.reservas))
+                     for (g, m), dom in dominios(inst).completos().items()],
+    })
+
+@bp.route("/trabajos/<trabajo_id>")
+def ver_trabajo(trabajo_id):
+    trabajo = trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        abort(404)
+    resultado = []
+    if trabajo.estado == "terminado":
+        resultado = _consulta_horario(trabajo.version).all()
+    # el aviso sale de la corrida (telemetría): la petición no recalcula dominios
+    vacios = [(s["grupo_id"], s["materia_id"]) for s in trabajo.sin_dominio or ()]
+    return render_template("resultado.html", resultado=resultado, puntaje=trabajo.puntaje, trabajo=trabajo,
+                           sin_dominio=_nombres_sesiones(vacios) if vacios else [])
+
+@bp.route("/api/trabajos/<trabajo_id>")
+def api_trabajo(trabajo_id):
+    trabajo = trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        abort(404)
+    return jsonify(trabajo.a_dict())
+
+@bp.route("/api/trabajos/<trabajo_id>/cancelar", methods=["POST"])
+def cancelar_trabajo(trabajo_id):
+    trabajo = trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        abort(404)
+    trabajo.cancelar()
+    return jsonify(trabajo.a_dict()), 202
+
+@bp.route("/api/trabajos/<trabajo_id>/eventos")
+def eventos_trabajo(trabajo_id):
+    """ Server-Sent Events con el estado del trabajo hasta que termine. """
+    trabajo = trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        abort(404)
+
+    def stream():
+        anterior = None
+        while True:
+            datos = json.dumps(trabajo.a_dict())
+            if datos != anterior:
+                yield f"data: {datos}\n\n"
+                anterior = datos
+            if trabajo.terminado:
+                return
+            time.sleep(0.5)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@bp.route("/api/ag/metricas")
+def api_metricas_ag():
+    """ Telemetría de la última corrida del AG (terminada, cancelada o con error). """
+    ultima = telemetria.ultima()
+    if ultima is None:
+        abort(404)
+    return jsonify(ultima.a_dict())
+
+def _vista_cacheada(clave, version, construir, mimetype="text/html"):
+    """ Respuesta de una vista del horario desde cache_horario; construir() arma el
+        cuerpo sólo si la clave no está. Lleva ETag y Last-Modified (de la versión
+        mostrada, ver versiones.modificada), así que un navegador que ya la tiene
+        recibe 304 sin cuerpo. Con mensajes flash pendientes se arma sin cache: la
+        página los muestra una sola vez. """
+    con_avisos = bool(session.get("_flashes"))
+    vista = None if con_avisos else cache_horario.cache.obtener(clave)
+    if vista is None:
+        cuerpo = construir()
+        modificada = versiones.modificada(version)
+        vista = (cache_horario.cache.armar(cuerpo, mimetype, modificada) if con_avisos
+                 else cache_horario.cache.guardar(clave, cuerpo, mimetype, modificada))
+    resp = Response(vista.cuerpo, mimetype=vista.mimetype)
+    resp.set_etag(vista.etag)
+    resp.last_modified = vista.modificada
+    resp.cache_control.no_cache = True  # revalidar siempre: se puede publicar otra versión
+    return resp.make_conditional(request)
 
 @bp.route("/horario")
 def listar_horario():
-    resultado = (db.session.query(Horario, Materia, Docente, Grupo)
-                 .join(Materia, Horario.materia_id == Materia.id)
-                 .join(Docente, Horario.docente_id == Docente.id)
-                 .join(Grupo, Horario.grupo_id == Grupo.id)
-                 .order_by(Grupo.nombre, Horario.dia, Horario.bloque_inicio)
-                 .all())
-    return render_template("resultado.html", resultado=resultado, puntaje=None)
+    """ Horario publicado, u otra versión con ?version=N (para comparar). """
+    version = versiones.sello(request.args.get("version", type=int))
+
+    def construir():
+        resultado = []
+        if version[1] is not None:
+            resultado = (_consulta_horario(version[0])
+                         .order_by(Grupo.nombre, Horario.dia, Horario.bloque_inicio)
+                         .all())
+        return render_template("resultado.html", resultado=resultado, puntaje=None)
+
+    return _vista_cacheada(("horario",) + version, version, construir)
+
+# ---------- Exportación del horario (CSV / iCalendar) ----------
+def _parametros_exportacion():
+    """ (sello de la versión, filtros, sufijo del archivo) desde ?version, ?grupo_id,
+        ?docente_id y ?turno; 404 si no hay versión, 400 si el turno no existe. """
+    version = versiones.sello(request.args.get("version", type=int))
+    if version[1] is None:
+        abort(404)
+    turno = request.args.get("turno")
+    try:
+        turno = Turno(turno.upper()) if turno else None
+    except ValueError:
+        abort(400)
+    grupo_id = request.args.get("grupo_id", type=int)
+    docente_id = request.args.get("docente_id", type=int)
+    sufijo = ((f"-grupo{grupo_id}" if grupo_id is not None else "")
+              + (f"-docente{docente_id}" if docente_id is not None else "")
+              + (f"-{turno.value.lower()}" if turno else ""))
+    return version, dict(grupo_id=grupo_id, docente_id=docente_id, turno=turno), sufijo
+
+def _descarga(trozos, mimetype, archivo):
+    """ Respuesta que se envía mientras se genera (sin armarla entera en memoria). """
+    resp = Response(stream_with_context(trozos), mimetype=mimetype)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{archivo}"'
+    return resp
+
+@bp.route("/exportar/horario.csv")
+def exportar_csv():
+    """ Horario publicado (u otra ?version=N) en CSV, filtrable por grupo_id, docente_id y turno. """
+    version, filtros, sufijo = _parametros_exportacion()
+    return _descarga(exportacion.csv_texto(version[0], **filtros), "text/csv",
+                     f"horario-v{version[0]}{sufijo}.csv")
+
+@bp.route("/exportar/horario.ics")
+def exportar_ical():
+    """ Igual que exportar_csv, en iCalendar: un evento semanal por sesión a partir de
+        ?desde=AAAA-MM-DD (por defecto el lunes de esta semana), hasta ?hasta si se da. """
+    version, filtros, sufijo = _parametros_exportacion()
+    try:
+        desde = date.fromisoformat(request.args["desde"]) if request.args.get("desde") else None
+        hasta = date.fromisoformat(request.args["hasta"]) if request.args.get("hasta") else None
+    except ValueError:
+        abort(400)
+    if desde is None:
+        desde = date.today() - timedelta(days=date.today().weekday())
+    return _descarga(exportacion.ical_texto(version[0], version[1], desde, hasta,
+                                            nombre=f"Horario v{version[0]}{sufijo}", **filtros),
+                     "text/calendar", f"horario-v{version[0]}{sufijo}.ics")
+
+@bp.route("/api/reprogramar", methods=["POST"])
+def api_reprogramar():
+    """ Reprogramación incremental tras un cambio del catálogo.
+        JSON: {"docentes": [ids], "grupos": [ids], "iteraciones": n, "publicar": bool}. """
+    datos = request.get_json(silent=True) or {}
+    try:
+        r = reprogramar(grupos=datos.get("grupos", ()), docentes=datos.get("docentes", ()),
+                        iteraciones=int(datos.get("iteraciones", 200)),
+                        publicar=bool(datos.get("publicar", True)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify(r)
+
+# ---------- Versiones del horario ----------
+@bp.route("/versiones")
+def listar_versiones():
+    filas = (db.session.query(VersionHorario, db.func.count(Horario.id))
+             .outerjoin(Horario, Horario.version_id == VersionHorario.id)
+             .group_by(VersionHorario.id)
+             .order_by(VersionHorario.id.desc())
+             .all())
+    return render_template("version_list.html", versiones=filas, activa=versiones.version_activa())
+
+@bp.route("/versiones/<int:version_id>/publicar", methods=["POST"])
+def publicar_version(version_id):
+    try:
+        versiones.publicar(version_id)
+    except ValueError:
+        abort(404)
+    flash(f"Versión {version_id} publicada", "success")
+    return redirect(url_for("main.listar_versiones"))
+
+@bp.route("/versiones/revertir", methods=["POST"])
+def revertir_version():
+    version_id = versiones.revertir()
+    if version_id is None:
+        flash("No hay una versión publicada anterior", "error")
+    else:
+        flash(f"Se volvió a publicar la versión {version_id}", "success")
+    return redirect(url_for("main.listar_versiones"))
+
+@bp.route("/api/versiones/<int:a>/comparar/<int:b>")
+def api_comparar_versiones(a, b):
+    """ Sesiones agregadas y quitadas al pasar de la versión a a la b. """
+    for version_id in (a, b):
+        if db.session.get(VersionHorario, version_id) is None:
+            abort(404)
+    return jsonify(dict(versiones.comparar(a, b), desde=a, hasta=b))
 
 # ---------- Tablero visual por grupo (8x5) ----------
+BLOQUES = list(range(1, 9))
+
+def _matriz(asignaciones):
+    """ matriz[bloque][dia] = {materia, docente, turno} (None si está libre)
+        a partir de filas (Horario, Materia, Docente) de un grupo. """
+    matriz = {b: {d: None for d in DIAS} for b in BLOQUES}
+    for h, m, d in asignaciones:
+        for b in range(h.bloque_inicio, h.bloque_fin + 1):
+            matriz[b][h.dia] = {
+                "materia": m.nombre,
+                "docente": d.nombre,
+                "turno": h.turno.value
+            }
+    return matriz
+
 @bp.route("/tablero")
 def tablero():
-    grupos = Grupo.query.order_by(Grupo.nombre).all()
     group_id = request.args.get("grupo_id", type=int)
-
-    matriz = None
-    grupo_sel = None
-    BLOQUES = list(range(1, 9))
-    total_asignaciones = 0
-
-    if group_id:
-        grupo_sel = Grupo.query.get_or_404(group_id)
-        dias = DIAS
-        matriz = {b: {d: None for d in dias} for b in BLOQUES}
-
-        asignaciones = (db.session.query(Horario, Materia, Docente)
-                        .join(Materia, Horario.materia_id == Materia.id)
-                        .join(Docente, Horario.docente_id == Docente.id)
-                        .filter(Horario.grupo_id == group_id)
-                        .all())
-
-        total_asignaciones = len(asignaciones)
-
-        for h, m, d in asignaciones:
-            for b in range(h.bloque_inicio, h.bloque_fin + 1):
-                matriz[b][h.dia] = {
-                    "materia": m.nombre,
-                    "docente": d.nombre,
-                    "turno": h.turno.value
-                }
-
-    return render_template("tablero.html",
-                           grupos=grupos,
-                           grupo_sel=grupo_sel,
-                           matriz=matriz,
-                           DIAS=DIAS,
-                           BLOQUES=BLOQUES,
-                           total_asignaciones=total_asignaciones)
+    version = versiones.sello()
+
+    def construir():
+        grupos = Grupo.query.order_by(Grupo.nombre).all()
+        matriz = None
+        grupo_sel = None
+        total_asignaciones = 0
+
+        if group_id:
+            grupo_sel = Grupo.query.get_or_404(group_id)
+            asignaciones = []
+            if version[1] is not None:
+                asignaciones = (db.session.query(Horario, Materia, Docente)
+                                .join(Materia, Horario.materia_id == Materia.id)
+                                .join(Docente, Horario.docente_id == Docente.id)
+                                .filter(Horario.grupo_id == group_id)
+                                .filter(Horario.version_id == version[0])
+                                .all())
+            total_asignaciones = len(asignaciones)
+            matriz = _matriz(asignaciones)
+
+        return render_template("tablero.html",
+                               grupos=grupos,
+                               grupo_sel=grupo_sel,
+                               matriz=matriz,
+                               DIAS=DIAS,
+                               BLOQUES=BLOQUES,
+                               total_asignaciones=total_asignaciones)
+
+    return _vista_cacheada(("tablero",) + version + (group_id,), version, construir)
 
 # ---------- API de depuración ----------
 @bp.route("/api/debug/horario/<int:grupo_id>")
 def api_debug_horario(grupo_id):
-    q = (db.session.query(Horario)
-         .filter(Horario.grupo_id == grupo_id)
-         .order_by(Horario.dia, Horario.bloque_inicio))
-    items = [{
-        "dia": h.dia,
-        "turno": h.turno.value,
-        "bloque_inicio": h.bloque_inicio,
-        "bloque_fin": h.bloque_fin,
-        "materia_id": h.materia_id,
-        "docente_id": h.docente_id,
-    } for h in q.all()]
-    return jsonify({"grupo_id": grupo_id, "count": len(items), "items": items})
+    version = versiones.sello()
+
+    def construir():
+        q = (db.session.query(Horario)
+             .filter(Horario.grupo_id == grupo_id)
+             .filter(Horario.version_id == version[0])
+             .order_by(Horario.dia, Horario.bloque_inicio))
+        items = [{
+            "dia": h.dia,
+            "turno": h.turno.value,
+            "bloque_inicio": h.bloque_inicio,
+            "bloque_fin": h.bloque_fin,
+            "materia_id": h.materia_id,
+            "docente_id": h.docente_id,
+        } for h in q.all()]
+        return current_app.json.dumps({"grupo_id": grupo_id, "count": len(items), "items": items})
+
+    return _vista_cacheada(("debug",) + version + (grupo_id,), version, construir, "application/json")
+
+@bp.route("/api/horario/grillas")
+def api_grillas():
+    """ Grilla de todos los grupos de una versión (por defecto la publicada; ?version=N)
+        con una sola consulta: grillas[dia][bloque - 1] = {materia, docente, turno} o null. """
+    version = versiones.sello(request.args.get("version", type=int))
+
+    def construir():
+        filas = (db.session.query(Grupo, Horario, Materia, Docente)
+                 .outerjoin(Horario, (Horario.grupo_id == Grupo.id) & (Horario.version_id == version[0]))
+                 .outerjoin(Materia, Horario.materia_id == Materia.id)
+                 .outerjoin(Docente, Horario.docente_id == Docente.id)
+                 .order_by(Grupo.nombre, Grupo.id)
+                 .all())
+        por_grupo = {}
+        for g, h, m, d in filas:
+            asignaciones = por_grupo.setdefault(g, [])
+            if h is not None:
+                asignaciones.append((h, m, d))
+        grupos = []
+        for g, asignaciones in por_grupo.items():
+            matriz = _matriz(asignaciones)
+            grupos.append({
+                "grupo_id": g.id,
+                "nombre": g.nombre,
+                "turno": g.turno.value,
+                "count": len(asignaciones),
+                "grilla": {dia: [matriz[b][dia] for b in BLOQUES] for dia in DIAS},
+            })
+        return current_app.json.dumps({"version": version[0], "grupos": grupos})
+
+    return _vista_cacheada(("grillas",) + version, version, construir, "application/json")
@@ -0,0 +1,113 @@
+import random
+from app import db, cache_horario
+from app.models import (
+    Grupo, Materia, Docente, DocenteMateria, Disponibilidad, ReservaModulo, MateriaGrupo,
+    Turno, DIAS
+)
+from app.ocupacion import BLOQUES_POR_TURNO, mascara
+
+
+# -------------------- Catálogo sintético --------------------
+def generar_catalogo(grupos=6, materias=8, docentes=4, materias_por_grupo=4, sesiones_semana=3,
+                     densidad_disponibilidad=1.0, densidad_reservas=0.0, duraciones=(2,),
+                     docentes_por_materia=2, semilla=0):
+    """ BORRA el catálogo y el horario de la BD actual y escribe uno sintético.
+
+        grupos / materias se reparten mitad por turno; cada grupo cursa
+        materias_por_grupo materias de su turno con sesiones_semana sesiones cada una.
+        Cada materia tiene docentes_por_materia docentes habilitados.
+        densidad_disponibilidad: fracción de (docente, día, turno) con los bloques 1..8
+        disponibles (cada docente conserva al menos uno).
+        densidad_reservas: probabilidad de que cada (grupo, materia) tenga una reserva
+        fija en un día al azar, sin encimarse con otras reservas del grupo.
+        duraciones: bloques_duracion posibles de las materias.
+        Devuelve un dict con cuántas filas se escribieron por tabla. """
+    rng = random.Random(semilla)
+    db.drop_all()
+    db.create_all()
+    cache_horario.invalidar()  # los ids vuelven a empezar: la versión 1 ya no es la misma
+
+    filas = {}
+    filas["grupo"] = [dict(id=i, nombre=f"G{i:04d}", turno=list(Turno)[(i - 1) % 2])
+                      for i in range(1, grupos + 1)]
+    filas["materia"] = [dict(id=i, nombre=f"M{i:04d}", turno=list(Turno)[(i - 1) % 2],
+                             bloques_duracion=rng.choice(duraciones))
+                        for i in range(1, materias + 1)]
+    filas["docente"] = [dict(id=i, nombre=f"Docente {i}", correo=f"d{i}@example.com")
+                        for i in range(1, docentes + 1)]
+
+    por_turno = {t: [m for m in filas["materia"] if m["turno"] == t] for t in Turno}
+    filas["materia_grupo"] = []
+    for g in filas["grupo"]:
+        candidatas = por_turno[g["turno"]]
+        for m in rng.sample(candidatas, min(materias_por_grupo, len(candidatas))):
+            filas["materia_grupo"].append(dict(
+                id=len(filas["materia_grupo"]) + 1, grupo_id=g["id"], materia_id=m["id"],
+                sesiones_semana=sesiones_semana))
+
+    filas["docente_materia"] = []
+    ids_docentes = [d["id"] for d in filas["docente"]]
+    for m in filas["materia"]:
+        for did in rng.sample(ids_docentes, min(docentes_por_materia, len(ids_docentes))):
+            filas["docente_materia"].append(dict(
+                id=len(filas["docente_materia"]) + 1, docente_id=did, materia_id=m["id"]))
+
+    filas["disponibilidad"] = []
+    ventanas = [(dia, turno) for dia in DIAS for turno in Turno]
+    for did in ids_docentes:
+        elegidas = [v for v in ventanas if rng.random() < densidad_disponibilidad] or [rng.choice(ventanas)]
+        for dia, turno in elegidas:
+            filas["disponibilidad"].append(dict(
+                id=len(filas["disponibilidad"]) + 1, docente_id=did, dia=dia, turno=turno,
+                bloque_inicio=1, bloque_fin=BLOQUES_POR_TURNO))
+
+    filas["reserva_modulo"] = []
+    duracion = {m["id"]: m["bloques_duracion"] for m in filas["materia"]}
+    ocupado = {}                                    # grupo_id -> máscara de slots reservados
+    for mg in filas["materia_grupo"]:
+        if rng.random() >= densidad_reservas:
+            continue
+        g, mid = mg["grupo_id"], mg["materia_id"]
+        turno = filas["grupo"][g - 1]["turno"]
+        dur = min(duracion[mid], BLOQUES_POR_TURNO)
+        for _ in range(10):                         # unos intentos para no encimarse
+            dia = rng.choice(DIAS)
+            ini = rng.randint(1, BLOQUES_POR_TURNO - dur + 1)
+            mask = mascara(dia, turno, ini, ini + dur - 1)
+            if not ocupado.get(g, 0) & mask:
+                ocupado[g] = ocupado.get(g, 0) | mask
+                filas["reserva_modulo"].append(dict(
+                    id=len(filas["reserva_modulo"]) + 1, grupo_id=g, materia_id=mid, dia=dia,
+                    turno=turno, bloque_inicio=ini, bloque_fin=ini + dur - 1))
+                break
+
+    # inserción masiva en orden de llaves foráneas
+    for modelo, tabla in ((Grupo, "grupo"), (Materia, "materia"), (Docente, "docente"),
+                          (MateriaGrupo, "materia_grupo"), (DocenteMateria, "docente_materia"),
+                          (Disponibilidad, "disponibilidad"), (ReservaModulo, "reserva_modulo")):
+        db.session.bulk_insert_mappings(modelo, filas[tabla])
+    db.session.commit()
+    return {tabla: len(f) for tabla, f in filas.items()}
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.sintetico --grupos 60 --materias 40 --docentes 30 [...]
+    # Reemplaza el catálogo de la BD configurada (DATABASE_URL), igual que seed.py.
+    import argparse
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético")
+    parser.add_argument("--grupos", type=int, default=6)
+    parser.add_argument("--materias", type=int, default=8)
+    parser.add_argument("--docentes", type=int, default=4)
+    parser.add_argument("--materias-por-grupo", type=int, default=4)
+    parser.add_argument("--sesiones", type=int, default=3)
+    parser.add_argument("--densidad-disponibilidad", type=float, default=1.0)
+    parser.add_argument("--densidad-reservas", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        print(generar_catalogo(args.grupos, args.materias, args.docentes, args.materias_por_grupo,
+                               args.sesiones, args.densidad_disponibilidad, args.densidad_reservas,
+                               semilla=args.semilla))
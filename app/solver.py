@@ -0,0 +1,202 @@
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from app.config import Config
+from app.constantes import Turno
+from app.dominios import sin_dominio
+from app.genetico import (
+    CONSTRUCTORES, CRUCES, MUTACIONES, SELECCIONES, cargar_horario, resolver
+)
+from app.instancia import armar_instancia
+
+# Archivos portables para correr el AG sin la aplicación web:
+#   instancia: las filas del catálogo que usa el AG (ver instancia.leer_catalogo)
+#   horario:   las sesiones asignadas del mejor individuo
+# Ambos son JSON; si la ruta termina en .gz se leen y escriben comprimidos.
+# Sólo exportar, importar e importar-catalogo tocan la BD (y por lo tanto Flask y SQLAlchemy).
+FORMATO_INSTANCIA = "horarios/instancia"
+FORMATO_HORARIO = "horarios/horario"
+VERSION_FORMATO = 1
+CAMPOS_SESION = ("grupo_id", "materia_id", "docente_id", "dia", "turno", "bloque_inicio", "bloque_fin")
+
+
+# -------------------- Archivos --------------------
+def _abrir(ruta, modo):
+    if ruta == "-":
+        return sys.stdin if "r" in modo else sys.stdout
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, modo + "t", encoding="utf-8")
+    return open(ruta, modo, encoding="utf-8")
+
+
+def _escribir(datos, ruta):
+    with _abrir(ruta, "w") as f:
+        json.dump(datos, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _leer(ruta, formato):
+    with _abrir(ruta, "r") as f:
+        datos = json.load(f)
+    if datos.get("formato") != formato:
+        raise ValueError(f"{ruta}: no es un archivo {formato}")
+    if datos.get("version") != VERSION_FORMATO:
+        raise ValueError(f"{ruta}: versión de formato {datos.get('version')} no soportada")
+    return datos
+
+
+def escribir_instancia(catalogo, ruta):
+    """ Guarda las filas de instancia.leer_catalogo() como archivo de instancia. """
+    _escribir(dict(catalogo, formato=FORMATO_INSTANCIA, version=VERSION_FORMATO), ruta)
+
+
+def leer_instancia(ruta):
+    """ Instancia desde un archivo de instancia, sin BD. """
+    datos = _leer(ruta, FORMATO_INSTANCIA)
+    return armar_instancia(datos["grupos"], datos["docentes"], datos["materias"], datos["materia_grupo"],
+                           datos["docente_materia"], datos["disponibilidad"], datos["reservas"])
+
+
+def escribir_horario(resultado, ruta, segundos=None):
+    """ Guarda las sesiones asignadas del mejor individuo y cómo terminó la corrida. """
+    sesiones = [dict(zip(CAMPOS_SESION, (g, m, d, dia, turno.value, ini, fin)))
+                for (g, m, d, dia, turno, ini, fin) in resultado.mejor if d and dia and ini is not None]
+    _escribir(dict(formato=FORMATO_HORARIO, version=VERSION_FORMATO, puntaje=resultado.puntaje,
+                   generaciones=resultado.generaciones, motivo=resultado.motivo, segundos=segundos,
+                   sesiones=sesiones), ruta)
+
+
+def leer_horario(ruta):
+    """ (datos del archivo, filas (grupo_id, materia_id, docente_id, dia, turno, ini, fin)). """
+    datos = _leer(ruta, FORMATO_HORARIO)
+    filas = [(s["grupo_id"], s["materia_id"], s["docente_id"], s["dia"], Turno(s["turno"]),
+              s["bloque_inicio"], s["bloque_fin"]) for s in datos["sesiones"]]
+    return datos, filas
+
+
+# -------------------- Comandos --------------------
+def cmd_resolver(args):
+    inicio = time.monotonic()
+    inst = leer_instancia(args.instancia)
+    for g, m in sin_dominio(inst):
+        print(f"aviso: grupo {g} materia {m} sin ubicación factible", file=sys.stderr)
+    if args.semilla is not None:
+        random.seed(args.semilla)
+    resultado = resolver(inst, args.generaciones, args.tam, args.elite, islas=args.islas,
+                         semilla=args.semilla, descomponer=args.descomponer,
+                         mutacion=args.mutacion, cruce=args.cruce, tasa_cruce=args.tasa_cruce,
+                         seleccion=args.seleccion, constructor=args.constructor,
+                         objetivo=args.objetivo, estancamiento=args.estancamiento,
+                         tiempo_max=args.tiempo_max)
+    segundos = round(time.monotonic() - inicio, 3)
+    escribir_horario(resultado, args.salida, segundos)
+    print(f"fitness {resultado.puntaje} en {resultado.generaciones} generaciones "
+          f"({resultado.motivo}, {segundos}s)", file=sys.stderr)
+
+
+def _app(bd):
+    from app import create_app
+    return create_app({"SQLALCHEMY_DATABASE_URI": bd} if bd else None)
+
+
+def cmd_exportar(args):
+    from app.instancia import leer_catalogo
+    with _app(args.bd).app_context():
+        catalogo = leer_catalogo()
+    escribir_instancia(catalogo, args.instancia)
+    print(f"{sum(n for g, m, n in catalogo['materia_grupo'])} sesiones exportadas", file=sys.stderr)
+
+
+def cmd_importar(args):
+    """ El horario se revisa contra el catálogo actual de la BD (ver
+        genetico.cargar_horario): las sesiones que ya no valen no se importan. """
+    from app import versiones
+    from app.instancia import cargar_instancia
+    datos, filas = leer_horario(args.horario)
+    with _app(args.bd).app_context():
+        ind, ev, descartadas = cargar_horario(cargar_instancia(), filas)
+        for fila in descartadas.values():
+            print(f"aviso: sesión descartada {fila}", file=sys.stderr)
+        version_id = versiones.crear_version(ind, ev.puntaje, datos.get("generaciones"), datos.get("motivo"),
+                                             nota=f"importado de {args.horario}")
+        if not args.no_publicar:
+            versiones.publicar(version_id)
+    print(f"versión {version_id} (fitness {ev.puntaje}, {len(descartadas)} descartadas)", file=sys.stderr)
+
+
+def cmd_importar_catalogo(args):
+    from app.importacion import importar_catalogo, leer_archivo
+    secciones = {}
+    for ruta in args.archivos:
+        with _abrir(ruta, "r") as f:
+            texto = f.read()
+        nombre = ruta[:-3] if ruta.endswith(".gz") else ruta
+        for seccion, filas in leer_archivo(texto, nombre, args.seccion).items():
+            secciones.setdefault(seccion, []).extend(filas)
+    with _app(args.bd).app_context():
+        r = importar_catalogo(secciones, parcial=args.parcial)
+    for seccion, s in r["secciones"].items():
+        print(f"{seccion:15} {s['validas']:7}/{s['filas']} filas válidas  {s['segundos']}s", file=sys.stderr)
+    for e in r["errores"]:
+        print(f"{e['seccion']} fila {e['fila']}: {e['error']}", file=sys.stderr)
+    print(f"{r['insertadas']} filas insertadas en {r['segundos']}s ({r['filas_por_segundo']} filas/s)",
+          file=sys.stderr)
+    if not r["confirmado"]:
+        raise ValueError(f"{r['total_errores']} filas con errores; no se guardó nada (ver --parcial)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.genetico",
+                                     description="Resuelve horarios sin la aplicación web")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("resolver", help="corre el AG sobre un archivo de instancia")
+    p.add_argument("instancia", help="archivo de instancia (.json o .json.gz; - = stdin)")
+    p.add_argument("-o", "--salida", default="-", help="archivo de horario (- = stdout)")
+    p.add_argument("--generaciones", type=int, default=60)
+    p.add_argument("--tam", type=int, default=30)
+    p.add_argument("--elite", type=int, default=6)
+    p.add_argument("--mutacion", choices=MUTACIONES, default=Config.AG_MUTACION)
+    p.add_argument("--cruce", choices=CRUCES, default=Config.AG_CRUCE)
+    p.add_argument("--tasa-cruce", type=float, default=Config.AG_TASA_CRUCE)
+    p.add_argument("--seleccion", choices=SELECCIONES, default=Config.AG_SELECCION)
+    p.add_argument("--constructor", choices=CONSTRUCTORES, default=Config.AG_CONSTRUCTOR)
+    p.add_argument("--islas", type=int, default=Config.AG_ISLAS)
+    p.add_argument("--descomponer", action="store_true", default=Config.AG_DESCOMPONER)
+    p.add_argument("--semilla", type=int, default=Config.AG_SEMILLA)
+    p.add_argument("--objetivo", type=int, default=Config.AG_OBJETIVO)
+    p.add_argument("--estancamiento", type=int, default=Config.AG_ESTANCAMIENTO)
+    p.add_argument("--tiempo-max", type=float, default=Config.AG_TIEMPO_MAX)
+    p.set_defaults(func=cmd_resolver)
+
+    p = sub.add_parser("exportar", help="escribe el catálogo de la BD como archivo de instancia")
+    p.add_argument("instancia")
+    p.add_argument("--bd", help="URI de la BD (por defecto la de la configuración)")
+    p.set_defaults(func=cmd_exportar)
+
+    p = sub.add_parser("importar", help="guarda un archivo de horario como versión nueva")
+    p.add_argument("horario")
+    p.add_argument("--bd", help="URI de la BD (por defecto la de la configuración)")
+    p.add_argument("--no-publicar", action="store_true", help="crear la versión sin publicarla")
+    p.set_defaults(func=cmd_importar)
+
+    p = sub.add_parser("importar-catalogo", help="alta masiva del catálogo desde CSV/JSON")
+    p.add_argument("archivos", nargs="+",
+                   help="grupos.csv, materias.csv, docentes.csv, plan.csv, disponibilidad.csv, "
+                        "reservas.csv (la sección sale del nombre) o un .json con varias secciones")
+    p.add_argument("--seccion", help="sección de los CSV si el nombre del archivo no la indica")
+    p.add_argument("--parcial", action="store_true", help="guardar las filas válidas aunque otras fallen")
+    p.add_argument("--bd", help="URI de la BD (por defecto la de la configuración)")
+    p.set_defaults(func=cmd_importar_catalogo)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(1, f"error: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Métricas de la última corrida de generar_horario (la expone /api/ag/metricas)
+_ultima = None
+_lock = threading.Lock()
+
+
+def ultima():
+    with _lock:
+        return _ultima
+
+
+def publicar(telemetria):
+    global _ultima
+    with _lock:
+        _ultima = telemetria
+
+
+class Telemetria:
+    """ Registro estructurado de una corrida del AG.
+
+        Por generación guarda mejor/medio/peor fitness, evaluaciones hechas, aciertos
+        y fallos de la cache y el tiempo de cada fase; además acumula el tiempo total
+        por fase (carga, inicializacion, evaluacion, orden, reproduccion, persistencia).
+        observadores: funciones llamadas con cada registro de generación (dict).
+        perfil=True corre la corrida bajo cProfile; memoria=True mide con tracemalloc. """
+
+    def __init__(self, observadores=(), perfil=False, memoria=False):
+        self.observadores = list(observadores)
+        self.perfil = perfil
+        self.memoria = memoria
+        self.fases = defaultdict(float)
+        self.generaciones = []
+        self.resumen = {}
+        self.inicio = None
+        self.fin = None
+        self._fases_generacion = defaultdict(float)
+        self._profiler = None
+
+    def suscribir(self, observador):
+        self.observadores.append(observador)
+
+    # ---------- ciclo de vida ----------
+    def iniciar(self):
+        self.inicio = time.time()
+        if self.perfil:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def terminar(self, resultado=None):
+        self.fin = time.time()
+        if self._profiler is not None:
+            self._profiler.disable()
+            salida = io.StringIO()
+            pstats.Stats(self._profiler, stream=salida).sort_stats("cumulative").print_stats(30)
+            self.resumen["perfil"] = salida.getvalue()
+            self._profiler = None
+        if self.memoria and tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            self.resumen["memoria_actual_bytes"] = actual
+            self.resumen["memoria_pico_bytes"] = pico
+            self.resumen["memoria_top"] = [str(s) for s in tracemalloc.take_snapshot().statistics("lineno")[:10]]
+            tracemalloc.stop()
+        if resultado is not None:
+            self.resumen.update(puntaje=resultado.puntaje, generaciones=resultado.generaciones,
+                                motivo=resultado.motivo)
+        self.resumen["segundos"] = self.fin - self.inicio
+
+    @contextmanager
+    def fase(self, nombre):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.fases[nombre] += dt
+            self._fases_generacion[nombre] += dt
+
+    # ---------- registros ----------
+    def generacion(self, numero, puntajes, evaluaciones=0, aciertos=0, fallos=0):
+        """ Cierra la generación `numero`: las fases medidas desde el registro anterior
+            quedan asociadas a ella. evaluaciones None = no se conocen (islas).
+            Devuelve el registro y avisa a los observadores. """
+        registro = {
+            "generacion": numero,
+            "mejor": max(puntajes),
+            "medio": sum(puntajes) / len(puntajes),
+            "peor": min(puntajes),
+            "evaluaciones": evaluaciones,
+            "cache_aciertos": aciertos,
+            "cache_fallos": fallos,
+            "fases": dict(self._fases_generacion),
+        }
+        if self.memoria and tracemalloc.is_tracing():
+            registro["memoria_bytes"] = tracemalloc.get_traced_memory()[0]
+        self._fases_generacion.clear()
+        self.generaciones.append(registro)
+        for observador in self.observadores:
+            observador(registro)
+        return registro
+
+    def a_dict(self):
+        return {
+            "inicio": self.inicio,
+            "fin": self.fin,
+            "fases": dict(self.fases),
+            "evaluaciones": sum(r["evaluaciones"] or 0 for r in self.generaciones),
+            "resumen": self.resumen,
+            "generaciones": self.generaciones,
+        }
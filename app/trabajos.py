@@ -0,0 +1,137 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.genetico import generar_horario
+
+# Un solo hilo de ejecución: dos corridas simultáneas se pisarían al guardar el horario.
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generar")
+_trabajos = OrderedDict()
+_lock = threading.Lock()
+MAX_TRABAJOS = 50  # historial de trabajos consultables
+
+
+class Cancelado(Exception):
+    pass
+
+
+class Trabajo:
+    """ Corrida de generar_horario en segundo plano con su progreso. """
+
+    def __init__(self, parametros):
+        self.id = uuid.uuid4().hex
+        self.parametros = parametros       # se sueltan al terminar (ver _soltar)
+        self.estado = "pendiente"          # pendiente | ejecutando | terminado | cancelado | error
+        self.generacion = 0
+        self.generaciones = parametros.get("generaciones", 60)
+        self.mejor = None
+        self.puntaje = None
+        self.motivo = None                 # motivo de parada del AG
+        self.version = None                # VersionHorario escrita por la corrida
+        self.error = None                  # mensaje de la excepción; el traceback va al log
+        self._sin_dominio = None
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self._cancelar = threading.Event()
+
+    @property
+    def terminado(self):
+        return self.estado in ("terminado", "cancelado", "error")
+
+    def eta(self):
+        """ Segundos restantes estimados con el ritmo de las generaciones ya hechas. """
+        if self.estado != "ejecutando" or not self.generacion:
+            return None
+        transcurrido = time.time() - self.inicio
+        return transcurrido / self.generacion * (self.generaciones - self.generacion)
+
+    @property
+    def sin_dominio(self):
+        """ Sesiones sin ubicación factible, [{grupo_id, materia_id}], según el
+            resumen de telemetría de la corrida; None hasta que se calculan. """
+        if self.parametros is None:
+            return self._sin_dominio
+        telemetria = self.parametros.get("telemetria")
+        return telemetria.resumen.get("sin_dominio") if telemetria is not None else None
+
+    def _soltar(self):
+        """ Suelta los parámetros de la corrida (la CacheFitness, la Telemetria con el
+            perfil) y guarda sólo lo que muestran a_dict() y la página del trabajo:
+            el historial retiene MAX_TRABAJOS trabajos. """
+        self._sin_dominio = self.sin_dominio
+        self.parametros = None
+
+    def cancelar(self):
+        self._cancelar.set()
+        if self.estado == "pendiente":
+            self.estado = "cancelado"
+            self.fin = time.time()
+            self._soltar()
+
+    def _progreso(self, generacion, generaciones, mejor):
+        if self._cancelar.is_set():
+            raise Cancelado()
+        self.generacion, self.generaciones, self.mejor = generacion, generaciones, mejor
+
+    def a_dict(self):
+        eta = self.eta()
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "generacion": self.generacion,
+            "generaciones": self.generaciones,
+            "mejor": self.mejor,
+            "puntaje": self.puntaje,
+            "motivo": self.motivo,
+            "version": self.version,
+            "eta_segundos": round(eta, 1) if eta is not None else None,
+            "error": self.error,
+            "sin_dominio": self.sin_dominio,
+            "creado": self.creado,
+            "inicio": self.inicio,
+            "fin": self.fin,
+        }
+
+
+def _correr(app, trabajo):
+    parametros = trabajo.parametros
+    if trabajo._cancelar.is_set() or parametros is None:
+        return
+    trabajo.estado = "ejecutando"
+    trabajo.inicio = time.time()
+    try:
+        with app.app_context():
+            resultado = generar_horario(progreso=trabajo._progreso, **parametros)
+        trabajo.puntaje = trabajo.mejor = resultado.puntaje
+        trabajo.generacion = resultado.generaciones
+        trabajo.motivo = resultado.motivo
+        trabajo.version = resultado.version
+        trabajo.estado = "terminado"
+    except Cancelado:
+        trabajo.estado = "cancelado"
+    except Exception as e:
+        app.logger.exception("Falló el trabajo de generación %s", trabajo.id)
+        trabajo.estado = "error"
+        trabajo.error = str(e) or type(e).__name__
+    finally:
+        trabajo.fin = time.time()
+        trabajo._soltar()
+
+
+def enviar(app, **parametros):
+    """ Encola generar_horario(**parametros) y devuelve el Trabajo sin esperar. """
+    trabajo = Trabajo(parametros)
+    with _lock:
+        _trabajos[trabajo.id] = trabajo
+        while len(_trabajos) > MAX_TRABAJOS:
+            _trabajos.popitem(last=False)
+    _ejecutor.submit(_correr, app, trabajo)
+    return trabajo
+
+
+def obtener(trabajo_id):
+    with _lock:
+        return _trabajos.get(trabajo_id)
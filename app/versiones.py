@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from app import db, cache_horario
+from app.models import Horario, VersionHorario, HorarioActivo
+
+
+# -------------------- Versiones del horario --------------------
+def version_activa():
+    """ id de la versión publicada, o None si todavía no hay horario. """
+    return db.session.query(HorarioActivo.version_id).filter_by(id=1).scalar()
+
+
+def sello(version_id=None):
+    """ (id, creada, publicada) de una versión (por defecto la publicada) en una
+        consulta; (version_id, None, None) si no existe. Identifica las vistas
+        cacheadas del horario: las filas de una versión no cambian después de crearla,
+        y las fechas distinguen ids reutilizados tras recrear la BD (seed.py) o una
+        publicación hecha desde otro proceso (ver modificada()). """
+    q = db.session.query(VersionHorario.id, VersionHorario.creada, VersionHorario.publicada)
+    if version_id is None:
+        q = q.join(HorarioActivo, HorarioActivo.version_id == VersionHorario.id).filter(HorarioActivo.id == 1)
+    else:
+        q = q.filter(VersionHorario.id == version_id)
+    fila = q.first()
+    return tuple(fila) if fila else (version_id, None, None)
+
+
+def modificada(sello):
+    """ Última vez que cambió lo que muestra la versión del sello: su creación o su
+        última publicación, en UTC y sin microsegundos (para Last-Modified); None si
+        no existe. No depende del proceso que la creó o publicó. """
+    fechas = [f for f in sello[1:] if f is not None]
+    return max(fechas).astimezone(timezone.utc).replace(microsecond=0) if fechas else None
+
+
+def filtro_version(version_id=None):
+    """ Condición sobre Horario para una versión; sin version_id, la publicada.
+        El puntero se lee en la misma consulta (subconsulta), así que un lector
+        siempre ve una versión completa aunque se publique otra a la vez. """
+    if version_id is not None:
+        return Horario.version_id == version_id
+    activa = db.session.query(HorarioActivo.version_id).filter_by(id=1).scalar_subquery()
+    return Horario.version_id == activa
+
+
+def crear_version(mejor, puntaje=None, generaciones=None, motivo=None, nota=None):
+    """ Escribe el individuo como una versión nueva, sin publicarla: las sesiones
+        asignadas entran con un solo INSERT masivo. Devuelve el id de la versión. """
+    version = VersionHorario(puntaje=puntaje, generaciones=generaciones, motivo=motivo, nota=nota)
+    db.session.add(version)
+    db.session.flush()
+    filas = [dict(version_id=version.id, grupo_id=g, materia_id=m, docente_id=d, dia=dia,
+                  turno=turno, bloque_inicio=ini, bloque_fin=fin)
+             for (g, m, d, dia, turno, ini, fin) in mejor if d and dia]
+    if filas:
+        db.session.execute(Horario.__table__.insert(), filas)
+    db.session.commit()
+    return version.id
+
+
+def publicar(version_id):
+    """ Hace visible version_id: una sola actualización del puntero en una transacción.
+        Descarta las vistas cacheadas del horario anterior. """
+    version = db.session.get(VersionHorario, version_id)
+    if version is None:
+        raise ValueError(f"No existe la versión {version_id}")
+    version.publicada = datetime.now()
+    if not HorarioActivo.query.filter_by(id=1).update({"version_id": version_id}):
+        db.session.add(HorarioActivo(id=1, version_id=version_id))
+    db.session.commit()
+    cache_horario.invalidar()
+
+
+def revertir():
+    """ Vuelve a publicar la versión publicada antes de la actual; devuelve su id
+        (None si no hay ninguna anterior). """
+    activa = version_activa()
+    anterior = (VersionHorario.query
+                .filter(VersionHorario.publicada.isnot(None), VersionHorario.id != activa)
+                .order_by(VersionHorario.publicada.desc())
+                .first())
+    if anterior is None:
+        return None
+    publicar(anterior.id)
+    return anterior.id
+
+
+def sesiones(version_id):
+    """ Conjunto de (grupo_id, materia_id, docente_id, dia, turno, ini, fin) de una versión. """
+    return {(g, m, d, dia, turno.value, ini, fin) for g, m, d, dia, turno, ini, fin in db.session.query(
+        Horario.grupo_id, Horario.materia_id, Horario.docente_id, Horario.dia, Horario.turno,
+        Horario.bloque_inicio, Horario.bloque_fin).filter(Horario.version_id == version_id)}
+
+
+def comparar(a, b):
+    """ Sesiones que están en la versión b y no en a (agregadas) y al revés (quitadas). """
+    return diferencia(sesiones(a), sesiones(b))
+
+
+def diferencia(sa, sb):
+    """ Diff entre dos conjuntos de sesiones (ver sesiones()). """
+    campos = ("grupo_id", "materia_id", "docente_id", "dia", "turno", "bloque_inicio", "bloque_fin")
+    return {
+        "agregadas": [dict(zip(campos, s)) for s in sorted(sb - sa)],
+        "quitadas": [dict(zip(campos, s)) for s in sorted(sa - sb)],
+    }
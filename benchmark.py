@@ -0,0 +1,231 @@
+# benchmark.py
+# Uso: python benchmark.py mutacion [--objetivo N] [--semillas K] [--generaciones G]
+#      python benchmark.py cruce [--cruce grupo|turno] [--tasa 0.6] [...]
+#      python benchmark.py islas [--islas 4] [--intervalo 10] [--migrantes 2] [...]
+#      python benchmark.py escala [--escalas 1,4,16] [--salida resultados.json] [...]
+#      python benchmark.py consultas [--escala 8]
+# Corre sobre el catálogo de la BD actual (p.ej. el de seed.py) sin modificar la tabla horario.
+# "escala" y "consultas" usan su propia BD (--bd) porque la llenan con catálogos sintéticos.
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from app import create_app, fitness_lote, versiones
+from app.genetico import (
+    evolucionar, generaciones_hasta, generar_individuo, fitness, generar_horario,
+    MUTACIONES, CRUCES, SELECCIONES
+)
+from app.instancia import cargar_instancia
+from app.islas import evolucionar_islas
+from app.sintetico import generar_catalogo
+
+
+def _historiales(inst, args, **kw):
+    res = []
+    for semilla in range(args.semillas):
+        random.seed(semilla)
+        res.append(evolucionar(inst, args.generaciones, args.tam, args.elite, **kw).historial)
+    return res
+
+
+def _reporte(historiales, args):
+    """ Generaciones (y evaluaciones de fitness) hasta alcanzar el objetivo por variante.
+        Sin --objetivo se usa el mejor puntaje encontrado por cualquier variante; una
+        variante que nunca lo alcanza aparece con generaciones None. """
+    objetivo = args.objetivo
+    if objetivo is None:
+        objetivo = max(max(h) for hists in historiales.values() for h in hists)
+    print(f"Objetivo de fitness: {objetivo}  ({args.semillas} semillas, {args.generaciones} generaciones)")
+    for nombre, hists in historiales.items():
+        gens = [generaciones_hasta(h, objetivo) for h in hists]
+        alcanzadas = [g for g in gens if g is not None]
+        media = sum(alcanzadas) / len(alcanzadas) if alcanzadas else None
+        # cada generación crea tam - elite hijos, cada uno es una evaluación
+        evals = None if media is None else args.tam + (args.tam - args.elite) * media
+        mejor = max(max(h) for h in hists)
+        print(f"  {nombre:16s} mejor={mejor:6d}  alcanzó {len(alcanzadas)}/{len(gens)}  "
+              f"generaciones={gens}  media={media}  evaluaciones={evals}")
+
+
+def bench_mutacion(inst, args):
+    """ Compara los modos de mutación (sin cruce). """
+    _reporte({modo: _historiales(inst, args, mutacion=modo) for modo in MUTACIONES}, args)
+
+
+def bench_cruce(inst, args):
+    """ Compara sólo mutación contra cruce con cada selección, todos con mutación "reparar". """
+    variantes = {"sin cruce": _historiales(inst, args, mutacion="reparar")}
+    for sel in SELECCIONES:
+        variantes[f"{args.cruce}/{sel}"] = _historiales(
+            inst, args, mutacion="reparar", cruce=args.cruce, tasa_cruce=args.tasa, seleccion=sel)
+    _reporte(variantes, args)
+
+
+def bench_islas(inst, args):
+    """ Tiempo de pared de las mismas islas en 1 proceso y en --islas procesos
+        (speedup), más la corrida serial de una sola población como referencia. """
+    opciones = dict(mutacion="reparar")
+
+    def medir(fn):
+        t0 = time.perf_counter()
+        puntaje = fn().puntaje
+        return time.perf_counter() - t0, puntaje
+
+    random.seed(0)
+    t_serial, p_serial = medir(lambda: evolucionar(inst, args.generaciones, args.tam, args.elite, **opciones))
+    corridas = {}
+    for procesos in (1, args.islas):
+        corridas[procesos] = medir(lambda: evolucionar_islas(
+            inst, args.islas, args.generaciones, args.tam, args.elite, args.intervalo,
+            args.migrantes, semilla=0, procesos=procesos, **opciones))
+    print(f"serial (1 población)        {t_serial:8.2f}s  fitness={p_serial}")
+    for procesos, (t, p) in corridas.items():
+        print(f"{args.islas} islas en {procesos:2d} proceso(s)  {t:8.2f}s  fitness={p}")
+    print(f"speedup de islas: {corridas[1][0] / corridas[args.islas][0]:.2f}x")
+
+
+def _medir(fn, repeticiones):
+    """ Segundos por llamada (sin tracemalloc, que la haría más lenta) y pico de
+        memoria de una llamada aparte medida con tracemalloc. """
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        valor = fn()
+    segundos = (time.perf_counter() - t0) / repeticiones
+    tracemalloc.start()
+    fn()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"segundos": segundos, "pico_bytes": pico, "repeticiones": repeticiones}, valor
+
+
+def _version():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_escala(args):
+    """ Tiempos y pico de memoria de generar_individuo, fitness (y fitness_lote con
+        numpy) y generar_horario sobre catálogos sintéticos de tamaño creciente:
+        escala k = 6k grupos, 8k materias, 4k docentes. generar_horario corre
+        exactamente --generaciones (sin objetivo ni estancamiento) para que los
+        tiempos sean comparables entre versiones. Devuelve un dict serializable. """
+    filas = []
+    for k in args.escalas:
+        conteo = generar_catalogo(grupos=6 * k, materias=8 * k, docentes=4 * k,
+                                  densidad_disponibilidad=args.densidad_disponibilidad,
+                                  densidad_reservas=args.densidad_reservas, semilla=0)
+        inst = cargar_instancia()
+        rng = random.Random(0)
+        mediciones = {}
+        mediciones["generar_individuo"], ind = _medir(lambda: generar_individuo(inst, rng), args.repeticiones)
+        mediciones["fitness"], _ = _medir(lambda: fitness(ind, inst), args.repeticiones)
+        if fitness_lote.DISPONIBLE:
+            poblacion = [generar_individuo(inst, rng) for _ in range(args.tam)]
+            mediciones["fitness_lote"], _ = _medir(lambda: fitness_lote.fitness_lote(poblacion, inst),
+                                                   args.repeticiones)
+        mediciones["generar_horario"], resultado = _medir(lambda: generar_horario(
+            args.generaciones, args.tam, args.elite, mutacion="reparar", semilla=0,
+            objetivo=float("inf"), estancamiento=None), 1)
+        mediciones["generar_horario"].update(puntaje=resultado.puntaje,
+                                             generaciones=resultado.generaciones)
+        filas.append({"escala": k, "sesiones": inst.n_sesiones, "filas": conteo, "mediciones": mediciones})
+        print(f"escala {k:3d}: {inst.n_sesiones:6d} sesiones  " + "  ".join(
+            f"{nombre}={m['segundos'] * 1000:.2f}ms/{m['pico_bytes'] / 1024:.0f}KiB"
+            for nombre, m in mediciones.items()), file=sys.stderr)
+    return {
+        "version": _version(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": fitness_lote.DISPONIBLE,
+        "parametros": {"generaciones": args.generaciones, "tam": args.tam, "elite": args.elite,
+                       "repeticiones": args.repeticiones,
+                       "densidad_disponibilidad": args.densidad_disponibilidad,
+                       "densidad_reservas": args.densidad_reservas},
+        "resultados": filas,
+    }
+
+
+# listados que deben hacer las mismas consultas SQL sin importar cuántas filas muestren
+RUTAS_LISTADO = ("/grupos", "/materias", "/plan", "/docentes", "/reservas", "/horario", "/versiones",
+                 "/tablero?grupo_id=1", "/api/debug/horario/1", "/api/horario/grillas")
+
+
+def bench_consultas(app, args):
+    """ Consultas SQL (cabecera X-Consultas-SQL) de cada listado con el catálogo
+        sintético de escala 1 y el de escala --escala, con un horario publicado.
+        Un listado cuyas consultas crecen con las filas tiene un N+1; devuelve esas rutas. """
+    conteos = {ruta: [] for ruta in RUTAS_LISTADO}
+    for k in (1, args.escala):
+        with app.app_context():
+            generar_catalogo(grupos=6 * k, materias=8 * k, docentes=4 * k, densidad_reservas=0.2, semilla=0)
+            inst = cargar_instancia()
+            versiones.publicar(versiones.crear_version(generar_individuo(inst, random.Random(0))))
+        cliente = app.test_client()
+        for ruta in RUTAS_LISTADO:
+            respuesta = cliente.get(ruta)
+            conteos[ruta].append(int(respuesta.headers["X-Consultas-SQL"]))
+    crecen = [ruta for ruta, (chico, grande) in conteos.items() if grande > chico]
+    for ruta, (chico, grande) in conteos.items():
+        print(f"  {ruta:24s} escala 1: {chico:3d}  escala {args.escala}: {grande:3d}"
+              + ("  <- N+1" if ruta in crecen else ""))
+    return crecen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mediciones del algoritmo genético")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("--objetivo", type=int, default=None)
+    comunes.add_argument("--semillas", type=int, default=3)
+    comunes.add_argument("--generaciones", type=int, default=60)
+    comunes.add_argument("--tam", type=int, default=30)
+    comunes.add_argument("--elite", type=int, default=6)
+    sub.add_parser("mutacion", parents=[comunes], help="compara los modos de mutación")
+    p = sub.add_parser("cruce", parents=[comunes], help="compara sólo mutación contra cruce")
+    p.add_argument("--cruce", choices=CRUCES, default="grupo")
+    p.add_argument("--tasa", type=float, default=0.6)
+    p = sub.add_parser("islas", parents=[comunes], help="speedup del modelo de islas")
+    p.add_argument("--islas", type=int, default=4)
+    p.add_argument("--intervalo", type=int, default=10)
+    p.add_argument("--migrantes", type=int, default=2)
+    p = sub.add_parser("escala", parents=[comunes], help="tiempos y memoria con catálogos sintéticos")
+    p.add_argument("--escalas", type=lambda s: [int(x) for x in s.split(",")], default=[1, 4, 16])
+    p.add_argument("--repeticiones", type=int, default=20)
+    p.add_argument("--densidad-disponibilidad", type=float, default=0.8)
+    p.add_argument("--densidad-reservas", type=float, default=0.2)
+    p.add_argument("--bd", default="sqlite:///benchmark_sintetico.db")
+    p.add_argument("--salida", help="archivo JSON (por defecto se imprime en stdout)")
+    p = sub.add_parser("consultas", help="falla si las consultas SQL de un listado crecen con los datos")
+    p.add_argument("--escala", type=int, default=8)
+    p.add_argument("--bd", default="sqlite:///benchmark_sintetico.db")
+    args = parser.parse_args()
+
+    if args.cmd == "consultas":
+        sys.exit(1 if bench_consultas(create_app({"SQLALCHEMY_DATABASE_URI": args.bd}), args) else 0)
+
+    if args.cmd == "escala":
+        with create_app({"SQLALCHEMY_DATABASE_URI": args.bd}).app_context():
+            datos = json.dumps(bench_escala(args), indent=2)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(datos)
+        else:
+            print(datos)
+        sys.exit()
+
+    app = create_app()
+    with app.app_context():
+        inst = cargar_instancia()
+        if args.cmd == "mutacion":
+            bench_mutacion(inst, args)
+        elif args.cmd == "cruce":
+            bench_cruce(inst, args)
+        elif args.cmd == "islas":
+            bench_islas(inst, args)
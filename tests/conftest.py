@@ -0,0 +1,24 @@
+import pytest
+
+from app.constantes import DIAS
+from app.instancia import armar_instancia
+
+
+# -------------------- Instancia de prueba (sin BD) --------------------
+def instancia_prueba():
+    """ 3 grupos, 4 docentes, 6 materias (2 vespertinas), disponibilidad parcial y
+        dos reservas: hay choques y sesiones sin dominio suficiente. """
+    materias = [(1, "MATUTINO", 2), (2, "MATUTINO", 1), (3, "MATUTINO", 3),
+                (4, "MATUTINO", 2), (5, "VESPERTINO", 2), (6, "VESPERTINO", 1)]
+    materia_grupo = [(g, m, n) for g in (1, 2, 3) for m, n in ((1, 3), (2, 2), (3, 1), (4, 2), (5, 2), (6, 1))]
+    docente_materia = [(1, 1), (1, 2), (2, 3), (2, 4), (3, 5), (3, 6), (4, 1), (4, 4)]
+    disponibilidad = [(d, dia, "MATUTINO", 1, 8) for d in (1, 2, 4) for dia in DIAS[:4]]
+    disponibilidad += [(3, dia, "VESPERTINO", 1, 6) for dia in DIAS]
+    reservas = [(1, 1, "LUNES", "MATUTINO", 1, 2), (2, 5, "MARTES", "VESPERTINO", 3, 4)]
+    return armar_instancia((1, 2, 3), (1, 2, 3, 4), materias, materia_grupo, docente_materia,
+                           disponibilidad, reservas)
+
+
+@pytest.fixture(scope="session")
+def inst():
+    return instancia_prueba()
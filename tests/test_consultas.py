@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+from app import create_app, db, versiones
+from app.consultas import contar_consultas
+from app.genetico import generar_individuo
+from app.instancia import cargar_instancia
+from app.sintetico import generar_catalogo
+
+# listados cuyas consultas SQL no deben crecer con las filas que muestran
+RUTAS = ("/docentes", "/plan", "/reservas", "/tablero?grupo_id=1", "/api/horario/grillas")
+
+
+def _consultas_por_ruta(app, escala):
+    """ Sentencias SQL de cada ruta con el catálogo sintético de esa escala y un
+        horario publicado. """
+    with app.app_context():
+        generar_catalogo(grupos=6 * escala, materias=8 * escala, docentes=4 * escala,
+                         densidad_reservas=0.2, semilla=0)
+        inst = cargar_instancia()
+        versiones.publicar(versiones.crear_version(generar_individuo(inst, random.Random(0))))
+        motor = db.engine
+    cliente = app.test_client()
+    conteos = {}
+    for ruta in RUTAS:
+        with contar_consultas(motor) as sentencias:
+            respuesta = cliente.get(ruta)
+        assert respuesta.status_code == 200, ruta
+        assert int(respuesta.headers["X-Consultas-SQL"]) == len(sentencias)
+        conteos[ruta] = len(sentencias)
+    return conteos
+
+
+def test_listados_sin_n_mas_1(tmp_path):
+    """ Con 4 veces más grupos, materias y docentes, cada listado hace las mismas
+        consultas: un N+1 las haría crecer con las filas. """
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'consultas.db'}",
+                      "HORARIO_CACHE": 0, "TESTING": True})
+    chico = _consultas_por_ruta(app, 1)
+    grande = _consultas_por_ruta(app, 4)
+    assert grande == chico
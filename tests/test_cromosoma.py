@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from app.cromosoma import CAMPOS, compactar, compactar_poblacion, expandir, expandir_poblacion
+from app.genetico import generar_individuo
+
+
+# -------------------- Ida y vuelta sin pérdida --------------------
+def test_ida_y_vuelta(inst):
+    for semilla in range(5):
+        ind = generar_individuo(inst, rng=random.Random(semilla))
+        datos = compactar(ind, inst)
+        assert len(datos) == CAMPOS * len(ind)
+        assert expandir(datos, inst) == ind
+
+
+def test_genes_sin_asignar_y_reserva_sin_docente(inst):
+    """ Un gen a medio asignar (reserva sin docente) y genes sin asignar vuelven igual. """
+    ind = generar_individuo(inst, rng=random.Random(1))
+    (g, m, dia), (ini, fin) = next(iter(inst.reservas_rangos.items()))
+    r = next(i for i, sesion in enumerate(inst.sesiones) if sesion[:2] == (g, m))
+    for i in range(0, len(ind), 3):
+        gi, mi, _d, _dia, turno, _ini, _fin = ind[i]
+        ind[i] = (gi, mi, None, None, turno, None, None)
+    ind[r] = (g, m, None, dia, inst.sesiones[r][2], ini, fin)
+    assert expandir(compactar(ind, inst), inst) == ind
+    vacio = [(g, m, None, None, turno, None, None) for g, m, turno in inst.sesiones]
+    assert expandir(compactar(vacio, inst), inst) == vacio
+
+
+def test_poblacion(inst):
+    poblacion = [generar_individuo(inst, rng=random.Random(s)) for s in range(4)]
+    assert expandir_poblacion(compactar_poblacion(poblacion, inst), inst) == poblacion
+
+
+# -------------------- Individuos que no siguen a la instancia --------------------
+def test_individuo_desordenado(inst):
+    ind = generar_individuo(inst, rng=random.Random(2))
+    j = next(j for j in range(1, len(ind)) if ind[j][:2] != ind[0][:2])
+    ind[0], ind[j] = ind[j], ind[0]
+    with pytest.raises(ValueError):
+        compactar(ind, inst)
+
+
+def test_individuo_de_otro_largo(inst):
+    ind = generar_individuo(inst, rng=random.Random(3))
+    with pytest.raises(ValueError):
+        compactar(ind[:-1], inst)
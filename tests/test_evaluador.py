@@ -0,0 +1,63 @@
+import random
+
+from app.dominios import dominios
+from app.evaluador import EvaluadorIncremental
+from app.genetico import fitness, generar_individuo
+
+
+def _gen_al_azar(ind, i, inst, rng):
+    """ Reemplazo para el gen i: sin asignar, una opción de su dominio (reservas
+        incluidas) o la ubicación de otro gen, que suele chocar. """
+    g, m, _d, _dia, turno, _ini, _fin = ind[i]
+    eleccion = rng.random()
+    if eleccion < 0.25:
+        return (g, m, None, None, turno, None, None)
+    dom = dominios(inst)[(g, m)]
+    opciones = [op for op in dom.libres + dom.reservas if op.docentes]
+    if eleccion < 0.6 and opciones:
+        op = rng.choice(opciones)
+        return (g, m, rng.choice(op.docentes), op.dia, turno, op.ini, op.fin)
+    dur = inst.duracion[m]
+    otros = [gen for gen in ind if gen[2] is not None and gen[4] == turno and gen[6] - gen[5] + 1 == dur]
+    if not otros:
+        return (g, m, None, None, turno, None, None)
+    otro = rng.choice(otros)
+    return (g, m) + otro[2:4] + (turno,) + otro[5:]
+
+
+# -------------------- Paridad con fitness --------------------
+def test_asignar_sigue_a_fitness(inst):
+    rng = random.Random(1)
+    for semilla in range(5):
+        ind = generar_individuo(inst, rng=random.Random(semilla))
+        ev = EvaluadorIncremental(ind, inst)
+        assert ev.puntaje == fitness(ind, inst)
+        for _ in range(200):
+            i = rng.randrange(len(ind))
+            assert ev.asignar(i, _gen_al_azar(ev.genes, i, inst, rng)) == fitness(ev.genes, inst)
+
+
+def test_deshacer_vuelve_a_lo_confirmado(inst):
+    rng = random.Random(2)
+    ev = EvaluadorIncremental(generar_individuo(inst, rng=random.Random(2)), inst)
+    for _ in range(30):
+        confirmados, puntaje = list(ev.genes), ev.puntaje
+        for _ in range(rng.randint(1, 8)):
+            i = rng.randrange(len(ev.genes))
+            ev.asignar(i, _gen_al_azar(ev.genes, i, inst, rng))
+        if rng.random() < 0.5:
+            assert ev.deshacer() == puntaje
+            assert ev.genes == confirmados
+        else:
+            ev.confirmar()
+        assert ev.puntaje == fitness(ev.genes, inst)
+
+
+def test_desde_individuo_sin_asignar(inst):
+    """ Arranca con todo sin asignar y lo llena de a un gen, como reparar(). """
+    rng = random.Random(3)
+    ind = [(g, m, None, None, turno, None, None) for g, m, turno in inst.sesiones]
+    ev = EvaluadorIncremental(ind, inst)
+    assert ev.puntaje == -80 * len(ind) == fitness(ind, inst)
+    for i in range(len(ind)):
+        assert ev.asignar(i, _gen_al_azar(ev.genes, i, inst, rng)) == fitness(ev.genes, inst)
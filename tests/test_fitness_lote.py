@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.fitness_lote import fitness_lote
+from app.genetico import MAX_MATERIAS_DIA_POR_GRUPO, fitness, generar_individuo, mutar
+
+
+def _comparar(poblacion, inst):
+    assert list(fitness_lote(poblacion, inst)) == [fitness(ind, inst) for ind in poblacion]
+
+
+# -------------------- Paridad con fitness --------------------
+@pytest.mark.parametrize("constructor", ["plan", "restringido"])
+def test_individuos_generados(constructor, inst):
+    rng = random.Random(7)
+    _comparar([generar_individuo(inst, rng=rng, constructor=constructor) for _ in range(20)], inst)
+
+
+def test_individuos_mutados(inst):
+    random.seed(11)
+    rng = random.Random(11)
+    base = [generar_individuo(inst, rng=rng) for _ in range(10)]
+    poblacion = [mutar(ind, 0.3, inst=inst) for ind in base]
+    poblacion += [mutar(ind, 0.3, modo="reparar", inst=inst) for ind in base]
+    _comparar(poblacion, inst)
+
+
+def test_choques_inyectados(inst):
+    """ Copia docente, día y bloques de un gen en otros: choques de docente y de grupo. """
+    rng = random.Random(3)
+    poblacion = []
+    for _ in range(20):
+        ind = generar_individuo(inst, rng=rng)
+        asignados = [i for i, gen in enumerate(ind) if gen[2] is not None]
+        for _ in range(4):
+            i, j = rng.sample(asignados, 2)
+            g, m, _d, _dia, turno, _ini, _fin = ind[j]
+            ind[j] = (g, m) + ind[i][2:4] + (turno,) + ind[i][5:]
+        poblacion.append(ind)
+    _comparar(poblacion, inst)
+
+
+def test_genes_sin_asignar(inst):
+    rng = random.Random(5)
+    poblacion = []
+    for k in range(6):
+        ind = generar_individuo(inst, rng=rng)
+        for i in range(0, len(ind), k + 1):
+            g, m, _d, _dia, turno, _ini, _fin = ind[i]
+            ind[i] = (g, m, None, None, turno, None, None)
+        poblacion.append(ind)
+    _comparar(poblacion, inst)
+
+
+def test_exceso_materias_por_dia(inst):
+    """ Todas las sesiones del grupo 1 el lunes: supera el máximo diario (y choca). """
+    ind = generar_individuo(inst, rng=random.Random(9))
+    for i, (g, m, d, dia, turno, ini, fin) in enumerate(ind):
+        if g == 1 and d is not None:
+            ind[i] = (g, m, d, "LUNES", turno, ini, fin)
+    assert sum(1 for gen in ind if gen[0] == 1 and gen[3] == "LUNES") > MAX_MATERIAS_DIA_POR_GRUPO
+    _comparar([ind, generar_individuo(inst, rng=random.Random(10))], inst)
+
+
+def test_poblaciones_sucesivas(inst):
+    """ La tabla de genes persiste entre llamadas: una segunda población con genes
+        nuevos y repetidos debe dar lo mismo que fitness. """
+    rng = random.Random(13)
+    primera = [generar_individuo(inst, rng=rng) for _ in range(10)]
+    _comparar(primera, inst)
+    random.seed(13)
+    _comparar([mutar(ind, 0.5, modo="reparar", inst=inst) for ind in primera] + primera[:3], inst)
+
+
+def test_poblacion_vacia(inst):
+    assert len(fitness_lote([], inst)) == 0
@@ -0,0 +1,37 @@
+from app.evaluador import EvaluadorIncremental
+from app.genetico import fitness, reparar
+from app.instancia import armar_instancia
+
+
+# -------------------- reparar --------------------
+def _una_sesion(dur, disponibilidad):
+    """ Un grupo, un docente y una sesión de `dur` bloques con reserva el lunes 1..dur. """
+    return armar_instancia((1,), (1,), [(1, "MATUTINO", dur)], [(1, 1, 1)], [(1, 1)],
+                           [(1, "LUNES", "MATUTINO") + disponibilidad],
+                           [(1, 1, "LUNES", "MATUTINO", 1, dur)])
+
+
+def _reparar(inst):
+    g, m, turno = inst.sesiones[0]
+    ind = [(g, m, None, None, turno, None, None)]
+    ev = EvaluadorIncremental(ind, inst)
+    reparar(ind, inst, ev)
+    assert ev.puntaje == fitness(ind, inst)
+    return ind, ev.puntaje
+
+
+def test_reparar_prefiere_tramo_libre():
+    """ La reserva propia también resta -50 por bloque: con un tramo libre, va ahí. """
+    for dur in (1, 2):
+        ind, puntaje = _reparar(_una_sesion(dur, (1, 8)))
+        assert puntaje == 10
+        assert ind[0][5] > dur
+
+
+def test_reparar_reserva_solo_si_mejora():
+    # 1 bloque en la reserva: 10 - 50 = -40, mejor que sin asignar (-80)
+    ind, puntaje = _reparar(_una_sesion(1, (1, 1)))
+    assert ind[0][3:4] + ind[0][5:] == ("LUNES", 1, 1) and puntaje == -40
+    # 2 bloques: 10 - 100 = -90, peor; queda sin asignar
+    ind, puntaje = _reparar(_una_sesion(2, (1, 2)))
+    assert ind[0][2] is None and puntaje == -80